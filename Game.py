@@ -4,17 +4,14 @@
 # @Time: 2023/12/11
 # @Author: Friman
 
-print("加载游戏模块...")
 import numpy as np
 import math
-np.random.seed(3407)
-import tqdm
-import matplotlib.pyplot as plt
+import copy
 import configparser
 import os
+import types
 import warnings
 #warnings.filterwarnings("ignore")
-plt.rcParams['font.sans-serif']=['SimHei']
 
 '''
 10人进行博弈，你作为其中之一，尽力取得高分
@@ -25,21 +22,93 @@ D. 智慧（人数最少时，每人+2分）
 E. 勇气（若仅有你一人选择此项，+4分）
 '''
 
-from strategies import normal
-from _p5af37c import wtf
+from strategies import STRATEGIES, normal
+import seeding
+from payoff import OPTION_KINDS, option_payoffs, parse_options, payoff_table
+from recorder import TrajectoryRecorder
+import checkpoint
+from convergence import DEFAULTS as CONVERGENCE_DEFAULTS, ConvergenceMonitor
+from instrument import Instrument, clock
+from display import pyplot, trange
+
+SCORE = {}  # 参数类 → 实测的每轮游戏耗时（秒），需要估计运行时间时由 _time_per_epoch 测得
+
+# 已解析的配置：(参数类, 配置文件绝对路径) → (读取过的每个文件及其修改时间, 冻结的参数模板)
+# 同一进程（以及 fork 出的子进程）中重复加载未修改的配置时不再解析 ini 文件
+_config_cache = {}
+
+# 每局游戏的运行状态，不属于配置，不进入缓存
+_RUNTIME_FIELDS = ('iter', 'ans_list', 'crowds_ans', 'score_list')
+
+# 游戏过程中变化的概率，保存检查点时与配置分开保存
+_STATE_FIELDS = ('pList', 'pMatrix', 'log_pList', 'log_pMatrix')
+
+# 未配置检查点间隔时，每多少轮保存一次检查点
+CHECKPOINT_EVERY = 10000
+
+
+def _mtime(path):
+    """文件或目录的修改时间（纳秒），不存在时为 None。"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _config_root(config_file):
+    """
+    questions 和 strategies 目录所在的目录：优先为配置文件所在的目录，其次为本模块所在的目录，
+    与当前工作目录无关。
+    """
+    config_dir = os.path.dirname(os.path.abspath(config_file))
+    for root in (config_dir, os.path.dirname(os.path.abspath(__file__))):
+        if os.path.isdir(os.path.join(root, 'questions')):
+            return root
+    return config_dir
+
+
+def _freeze(fields):
+    """参数模板：列表转为元组、字典转为只读映射，缓存中的模板不会被修改。"""
+    frozen = {}
+    for name, value in fields.items():
+        if isinstance(value, list):
+            value = tuple(value)
+        elif isinstance(value, dict):
+            value = types.MappingProxyType(dict(value))
+        frozen[name] = value
+    return types.MappingProxyType(frozen)
+
+
+def _thaw(value):
+    """返回参数值的独立副本（只复制一层，选项集合中的元组等不可变对象共享）。"""
+    if isinstance(value, (list, tuple)) and not isinstance(value, str):
+        return list(value)
+    if isinstance(value, (dict, types.MappingProxyType)):
+        return dict(value)
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    return value
+
 
 class Parameters:
     """
     表示游戏策略的参数。
 
+    解析和检查过的配置按 (参数类, 配置文件路径) 缓存，配置文件及其引用的 questions、strategies 下的
+    default.ini 都没有修改时，再次加载只复制缓存中的参数模板。需要修改参数时用 replace 得到副本。
+
     参数：
-        config_file (str)：配置文件的路径。
+        config_file (str)：配置文件的路径；questions 和 strategies 目录相对于配置文件所在目录查找。
 
     属性：
         NUM_PLAYERS (int)：游戏中的玩家数量。
         NUM_OPTIONS (int)：游戏中的选项数量。
         NUM_EPOCHS (int)：游戏中的循环次数。
         is_communicate (bool)：指示游戏中是否允许通信。
+        SEED (int)：根随机种子，未配置时为 None。
+        convergence (dict)：收敛检测参数（见 convergence.ConvergenceMonitor），未配置 [Convergence] 时为 None。
+        checkpoint (dict)：检查点参数 {'path': 文件路径, 'every': 间隔轮数}，未配置 [Checkpoint] 时为 None；
+            只由命令行入口使用，库调用需要检查点时向 Game.main 显式传入 checkpoint_path。
         pList (list)：初始概率列表。
         LEARN_RATE_UP (float)：增加概率的学习率。
         LEARN_RATE_DOWN (float)：减少概率的学习率。
@@ -51,35 +120,150 @@ class Parameters:
         ans_list (list)：答案列表。
         crowds_ans (list)：群体答案列表。
         score_list (list)：每个玩家的得分列表。
+        player_types (dict)：每种玩家类型的人数。
+        options (list)：选项集合，每项为 (名称, 规则)。
+        option_index (dict)：每种规则第一次出现的选项下标。
     """
+    # 玩家数量和选项数量的限制，大规模引擎（population.py）会放宽这两项
+    _valid_players = staticmethod(lambda x: x == 10)
+    _valid_options = staticmethod(lambda x: x == 5)
+
+    # 可以通过 replace 修改的参数：参数名 → (配置中的节, 合法性检查)，读取配置时使用相同的检查
+    _checks = {
+        'NUM_EPOCHS': ('Game', lambda self, x: x > 0),
+        'SEED': ('Game', lambda self, x: x is None or x >= 0),
+        'pList': ('InitialProbabilities',
+                  lambda self, x: len(x) == self.NUM_OPTIONS and math.isclose(sum(x), 1, rel_tol=1e-5)),
+        'LEARN_RATE_UP': ('Strategy', lambda self, x: x > 1),
+        'LEARN_RATE_DOWN': ('Strategy', lambda self, x: x > 1),
+        'WIS_VALUE': ('Strategy', lambda self, x: x > 0),
+        'SOLID_VALUE': ('Strategy', lambda self, x: x > 0),
+        'convergence': ('Convergence', lambda self, x: x is None or (set(x) <= set(CONVERGENCE_DEFAULTS)
+                                                                      and x.get('window', 1) > 0 and x.get('tolerance', 0) >= 0)),
+    }
+
     def __init__(self, config_file):
+        # 配置文件及其引用的题目、策略文件都没有修改时，直接复制缓存中的参数模板
+        key = (type(self), os.path.abspath(config_file))
+        cached = _config_cache.get(key)
+        if cached is not None and all(_mtime(path) == mtime for path, mtime in cached[0]):
+            for name, value in cached[1].items():
+                setattr(self, name, _thaw(value))
+        else:
+            files = self._load(config_file)
+            template = {name: value for name, value in vars(self).items() if name not in _RUNTIME_FIELDS}
+            _config_cache[key] = (tuple((path, _mtime(path)) for path in files), _freeze(template))
+
+        self.iter = 0
+        self.ans_list = [0] * self.NUM_OPTIONS
+        self.crowds_ans = []
+        self.score_list = [0] * self.NUM_PLAYERS
+
+        if self.NUM_EPOCHS >= 100000:
+            self._check_run_time()
+
+    def fields(self):
+        """
+        检查点用的配置字典：不含每局的运行状态和游戏过程中变化的概率（_RUNTIME_FIELDS、_STATE_FIELDS）。
+        """
+        return {name: _thaw(value) for name, value in vars(self).items()
+                if name not in _RUNTIME_FIELDS and name not in _STATE_FIELDS and not isinstance(value, np.ndarray)}
+
+    @classmethod
+    def from_fields(cls, fields):
+        """
+        由 fields() 的返回值重建参数对象，不读取配置文件，也不估计运行时间。
+        """
+        params = cls.__new__(cls)
+        for name, value in fields.items():
+            setattr(params, name, _thaw(value))
+        params.options = [tuple(option) for option in params.options]
+        params.iter = 0
+        params.ans_list = [0] * params.NUM_OPTIONS
+        params.crowds_ans = []
+        params.score_list = [0] * params.NUM_PLAYERS
+        return params
+
+    def _check(self, option):
+        """option 的合法性检查函数（见 _checks）。"""
+        check = self._checks[option][1]
+        return lambda x: check(self, x)
+
+    def _load(self, config_file):
+        """
+        解析并检查配置文件，以及 questions 和 strategies 下各题的 default.ini。
+
+        返回：
+        - 读取过的文件和目录路径列表，用于判断缓存是否过期
+        """
+        root = _config_root(config_file)
+        files = [os.path.abspath(config_file), os.path.join(root, 'questions')]
         config = configparser.ConfigParser()
         try:
             config.read(config_file)
         except Exception as e:
             raise Exception(f"找不到游戏配置文件: {e}")
-        
-        wtf(config_file)
 
         # 读取游戏参数
-        self.NUM_PLAYERS = self._get_and_validate(config, 'Game', 'NUM_PLAYERS', int, lambda x: x == 10)
-        self.NUM_OPTIONS = self._get_and_validate(config, 'Game', 'NUM_OPTIONS', int, lambda x: x == 5)
-        self.NUM_EPOCHS = self._get_and_validate(config, 'Game', 'NUM_EPOCHS', int, lambda x: 0 < x < 100000)
+        self.NUM_PLAYERS = self._get_and_validate(config, 'Game', 'NUM_PLAYERS', int, self._valid_players)
+        self.NUM_OPTIONS = self._get_and_validate(config, 'Game', 'NUM_OPTIONS', int, self._valid_options)
+        self.NUM_EPOCHS = self._get_and_validate(config, 'Game', 'NUM_EPOCHS', int, self._check('NUM_EPOCHS'))
         self.is_communicate = self._get_and_validate(config, 'Game', 'is_communicate', bool)
 
-        self.iter = 0
-        self.ans_list = [0] * self.NUM_OPTIONS
-        self.crowds_ans = []
-        self.score_list = [0] * self.NUM_PLAYERS
+        # 读取根随机种子，未配置时沿用全局随机数生成器
+        if config.has_option('Game', 'SEED'):
+            self.SEED = self._get_and_validate(config, 'Game', 'SEED', int, self._check('SEED'))
+        else:
+            self.SEED = None
+
+        # 读取收敛检测参数（见 convergence.py），未配置 [Convergence] 时不检测
+        if config.has_section('Convergence'):
+            def get(option, type_func, validation_func=None):
+                if not config.has_option('Convergence', option):
+                    return CONVERGENCE_DEFAULTS[option.lower()]
+                return self._get_and_validate(config, 'Convergence', option, type_func, validation_func)
+            self.convergence = {
+                'window': get('WINDOW', int, lambda x: x > 0),
+                'tolerance': get('TOLERANCE', float, lambda x: x >= 0),
+                'score_tolerance': get('SCORE_TOLERANCE', float, lambda x: x >= 0),
+                'patience': get('PATIENCE', int, lambda x: x > 0),
+                'early_stop': get('EARLY_STOP', lambda x: x.strip().lower() in ('1', 'yes', 'true', 'on')),
+            }
+        else:
+            self.convergence = None
+
+        # 读取检查点参数（命令行入口使用），未配置 [Checkpoint] 时不保存检查点；路径相对于配置文件所在目录
+        if config.has_section('Checkpoint'):
+            self.checkpoint = {
+                'path': os.path.join(os.path.dirname(os.path.abspath(config_file)),
+                                     self._get_and_validate(config, 'Checkpoint', 'PATH', str)),
+                'every': (self._get_and_validate(config, 'Checkpoint', 'EVERY', int, lambda x: x > 0)
+                          if config.has_option('Checkpoint', 'EVERY') else CHECKPOINT_EVERY),
+            }
+        else:
+            self.checkpoint = None
+
+        # 读取玩家类型，未配置时全部为“常人”
+        if config.has_section('PlayerTypes'):
+            self.player_types = {name: self._get_and_validate(config, 'PlayerTypes', name, int, lambda x: x >= 0)
+                                 for name in config.options('PlayerTypes')}
+        else:
+            self.player_types = {'normal': self.NUM_PLAYERS}
+        if sum(self.player_types.values()) != self.NUM_PLAYERS:
+            raise ValueError(f"各类玩家数量之和 {sum(self.player_types.values())} 与玩家数量 {self.NUM_PLAYERS} 不一致QAQ")
+        for name, count in self.player_types.items():
+            if count > 0 and name not in STRATEGIES:
+                raise ValueError(f"“{name}”类型的玩家还没有实现，先把人数设为0吧QAQ")
 
         # 读取题目和策略参数
-        for folder_name in os.listdir('questions'): # 遍历questions文件夹下的所有文件夹
-            q_folder_path = os.path.join('questions', folder_name)
-            s_folder_path = os.path.join('strategies', folder_name)
+        for folder_name in os.listdir(os.path.join(root, 'questions')): # 遍历questions文件夹下的所有文件夹
+            q_folder_path = os.path.join(root, 'questions', folder_name)
+            s_folder_path = os.path.join(root, 'strategies', folder_name)
             if os.path.isdir(q_folder_path):
                 # 读取default.ini文件
                 q_config_file = os.path.join(q_folder_path, 'default.ini')
                 s_config_file = os.path.join(s_folder_path, 'default.ini')
+                files += [q_config_file, s_config_file]
                 q_config = configparser.ConfigParser()
                 s_config = configparser.ConfigParser()
                 try:
@@ -99,22 +283,93 @@ class Parameters:
                     self.wisdom_score = self._get_and_validate(q_config, 'Q1', 'wisdom_score', int)
                     self.bravery_score = self._get_and_validate(q_config, 'Q1', 'bravery_score', int)
 
+                    # 读取选项集合，未配置时为五个经典选项
+                    if q_config.has_option('Q1', 'options'):
+                        self.options = self._get_and_validate(q_config, 'Q1', 'options', parse_options,
+                                                              lambda x: len(x) == self.NUM_OPTIONS)
+                    else:
+                        self.options = [(kind, kind) for kind in OPTION_KINDS]
+                    for name, _ in self.options:
+                        if not hasattr(self, f'{name}_score'):
+                            setattr(self, f'{name}_score', self._get_and_validate(q_config, 'Q1', f'{name}_score', int))
+                    self.option_index = {}
+                    for option, (_, kind) in enumerate(self.options):
+                        self.option_index.setdefault(kind, option)
+
                     # 读取初始概率
                     self.pList = self._get_and_validate(s_config, 'InitialProbabilities', 'pList', 
                                                         lambda x: list(map(float, x.split(','))), 
-                                                        lambda x: len(x) == self.NUM_OPTIONS and math.isclose(sum(x), 1, rel_tol=1e-5))
+                                                        self._check('pList'))
 
                     # 读取策略超参数
-                    self.LEARN_RATE_UP = self._get_and_validate(s_config, 'Strategy', 'LEARN_RATE_UP', float, lambda x: x > 1)
-                    self.LEARN_RATE_DOWN = self._get_and_validate(s_config, 'Strategy', 'LEARN_RATE_DOWN', float, lambda x: x > 1)
-                    self.WIS_VALUE = self._get_and_validate(s_config, 'Strategy', 'WIS_VALUE', float, lambda x: x > 0)
-                    self.SOLID_VALUE = self._get_and_validate(s_config, 'Strategy', 'SOLID_VALUE', float, lambda x: x > 0)
+                    self.LEARN_RATE_UP = self._get_and_validate(s_config, 'Strategy', 'LEARN_RATE_UP', float, self._check('LEARN_RATE_UP'))
+                    self.LEARN_RATE_DOWN = self._get_and_validate(s_config, 'Strategy', 'LEARN_RATE_DOWN', float, self._check('LEARN_RATE_DOWN'))
+                    self.WIS_VALUE = self._get_and_validate(s_config, 'Strategy', 'WIS_VALUE', float, self._check('WIS_VALUE'))
+                    self.SOLID_VALUE = self._get_and_validate(s_config, 'Strategy', 'SOLID_VALUE', float, self._check('SOLID_VALUE'))
                 # elif folder_name[1:] == '2':
                 #     pass
                 # elif folder_name[1:] == '3':
                 #     pass
                 # else:
                 #     pass
+        return files
+
+    def replace(self, **changes):
+        """
+        返回修改了部分参数的副本，不修改自身，也不修改配置缓存中的模板。
+        列表、字典和数组会被复制，其余参数与原对象共享（都是不可变的值）。
+
+        参数：
+        - changes：{参数名: 新值}，可以修改 _checks 中的参数和各选项的得分（*_score），
+          新值经过与读取配置时相同的检查
+
+        返回：
+        - 新的参数对象
+        """
+        params = copy.copy(self)
+        for name, value in vars(self).items():
+            setattr(params, name, _thaw(value))
+        for name, value in changes.items():
+            if name in self._checks:
+                section, check = self._checks[name]
+                if name == 'pList':
+                    value = [float(x) for x in value]
+                if not check(self, value):
+                    self._invalid(section, name, value)
+            elif not (name.endswith('_score') and hasattr(self, name)):
+                raise ValueError(f"参数 {name} 不能修改，可选 {tuple(self._checks)} 和各选项的得分")
+            setattr(params, name, value)
+        return params
+
+    def _time_per_epoch(self):
+        """
+        实测的每轮耗时（秒），跑分使用将要运行这些参数的引擎；单局游戏见 benchmark_brief。
+        """
+        return benchmark_brief(iter=1000, params=self)
+
+    def _check_run_time(self):
+        """
+        循环次数较多时，按实测的每轮耗时（见 _time_per_epoch，每个参数类只测一次）估计运行时间。
+        """
+        engine = type(self)
+        if engine not in SCORE:
+            SCORE[engine] = self._time_per_epoch()
+        time = round(SCORE[engine] * self.NUM_EPOCHS)
+        if 10 < time < 3600:
+            warnings.warn(f"你想让我循环这么多次吗, 预计需要 {time} 秒QAQ")
+            if input("确定要进行游戏吗？按回车键继续...") == 'q':
+                print("再见~")
+                exit()
+                #raise ValueError(f"你取消了游戏QAQ")
+        if time >= 3600:
+            if self.convergence is not None and self.convergence['early_stop']:
+                # 收敛后会提前结束，循环次数只是上限
+                warnings.warn(f"未收敛时模拟时间预计超过一个小时（{time} 秒），收敛后会提前结束")
+            elif self.checkpoint is not None:
+                # 定期保存检查点，中断后可以从检查点继续
+                warnings.warn(f"模拟时间预计 {time} 秒，从命令行运行时每 {self.checkpoint['every']} 轮保存检查点到 {self.checkpoint['path']}")
+            else:
+                raise ValueError(f"模拟时间预计超过一个小时，还是让电脑歇歇吧QAQ")
 
     def _get_and_validate(self, config, section, option, type_func, validation_func=None):
         try:
@@ -123,67 +378,75 @@ class Parameters:
             raise Exception(f"无法解析 {section} 中的 {option}: {e}")
 
         if validation_func and not validation_func(value):
-            if option == 'NUM_PLAYERS':
-                raise ValueError(f"咱们还是先考虑10人局吧，以后会扩展的QAQ")
+            self._invalid(section, option, value)
+
+        return value
+
+    def _invalid(self, section, option, value):
+        """option 的值 value 不合法时抛出对应的异常。"""
+        if option == 'NUM_PLAYERS':
+            raise ValueError(f"咱们还是先考虑10人局吧，以后会扩展的QAQ")
+        
+        elif option == 'NUM_OPTIONS':
+            if value > 5:
+                raise ValueError(f"你怎么知道第一题其实不止五个选项的，以后再加吧QAQ")
+            if 0 <= value < 5:
+                raise ValueError(f"我好心写了五个选项，你怎么可以不用QAQ")
+            if value < 0:
+                raise ValueError(f"负数选项？？？你认真的吗QAQ")
             
-            elif option == 'NUM_OPTIONS':
-                if value > 5:
-                    raise ValueError(f"你怎么知道第一题其实不止五个选项的，以后再加吧QAQ")
-                if 0 <= value < 5:
-                    raise ValueError(f"我好心写了五个选项，你怎么可以不用QAQ")
-                if value < 0:
-                    raise ValueError(f"负数选项？？？你认真的吗QAQ")
-                
-            elif option == 'NUM_EPOCHS':
-                time = round(SCORE * value)
-                if value < 0:
-                    raise ValueError(f"循环负数次？？你很有做测试工程师的潜力QAQ")
-                if 10 < time < 3600:
-                    warnings.warn(f"你想让我循环这么多次吗, 预计需要 {time} 秒QAQ")
-                    if input("确定要进行游戏吗？按回车键继续...") == 'q':
-                        print("再见~")
-                        exit()
-                        #raise ValueError(f"你取消了游戏QAQ")
-                if time >= 3600:
-                    raise ValueError(f"模拟时间预计超过一个小时，还是让电脑歇歇吧QAQ")
-                
-            elif option == 'cautious_score':
-                raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
-            elif option == 'fairness_score':
-                raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
-            elif option == 'solidarity_score':
-                raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
-            elif option == 'wisdom_score':
-                raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
-            elif option == 'bravery_score':
-                raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
-            elif option == 'pList':
-                if len(value) != self.NUM_OPTIONS:
-                    raise ValueError(f"初始概率列表 {value} 的长度不是 {self.NUM_OPTIONS}")
-                if not math.isclose(sum(value), 1, rel_tol=1e-5):
-                    raise ValueError(f"初始概率列表 {value} 的和不是1")
-                
-            elif option == 'LEARN_RATE_UP':
-                raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
-            elif option == 'LEARN_RATE_DOWN':
-                raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
-            elif option == 'WIS_VALUE':
-                raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
-            elif option == 'SOLID_VALUE':
-                raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
+        elif option == 'NUM_EPOCHS':
+            raise ValueError(f"循环负数次？？你很有做测试工程师的潜力QAQ")
             
-            else:
-                raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
+        elif option == 'cautious_score':
+            raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
+        elif option == 'fairness_score':
+            raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
+        elif option == 'solidarity_score':
+            raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
+        elif option == 'wisdom_score':
+            raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
+        elif option == 'bravery_score':
+            raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
+        elif option == 'options':
+            raise ValueError(f"选项集合 {value} 的长度不是 {self.NUM_OPTIONS}")
+        elif option == 'pList':
+            if len(value) != self.NUM_OPTIONS:
+                raise ValueError(f"初始概率列表 {value} 的长度不是 {self.NUM_OPTIONS}")
+            if not math.isclose(sum(value), 1, rel_tol=1e-5):
+                raise ValueError(f"初始概率列表 {value} 的和不是1")
+            
+        elif option == 'LEARN_RATE_UP':
+            raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
+        elif option == 'LEARN_RATE_DOWN':
+            raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
+        elif option == 'WIS_VALUE':
+            raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
+        elif option == 'SOLID_VALUE':
+            raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
+        
+        else:
+            raise ValueError(f"不要再输入奇怪的值啦，{section} 中 {option} 的值 {value} 是无效的QAQ")
 
-        return value
-    
 class Game:
-    def __init__(self, config_file):
+    def __init__(self, config_file, array_strategy=False, log_space=False, params=None, seed=None,
+                 record_stride=None, record_path=None):
         """
         初始化游戏对象。
 
         参数：
         - config_file：配置文件路径
+        - array_strategy：是否使用数组版本的策略（normal.norm_scheme_adjust_array），
+          pList 保存为 float64 数组并原地更新，结果与列表版本逐位相同
+        - log_space：数组版本的策略是否在对数空间中保存概率（隐含 array_strategy）
+        - params：可选，已加载的参数对象；给出时不再读取 config_file。游戏使用它的副本，不会修改它
+        - seed：可选，本次运行的随机种子（int 或 np.random.SeedSequence），默认为配置中的 SEED；
+          两者都没有时使用 numpy 的全局随机数生成器
+        - record_stride：轨迹记录间隔，默认约记录 100 次，为 1 时记录每一轮
+        - record_path：可选，把轨迹写入该目录下的内存映射 .npy 文件
+
+        玩家类型由配置文件的 [PlayerTypes] 给出。不全是“常人”时，每种类型分别保存概率并使用
+        strategies.STRATEGIES 中注册的策略，pList 为人群平均概率，pMatrix 为各类型的概率矩阵。
 
         属性：
         - NUM_PLAYERS：玩家数量
@@ -201,77 +464,320 @@ class Game:
         - LEARN_RATE_DOWN：策略学习率（减少）
         - WIS_VALUE：智慧值
         - SOLID_VALUE：团结值
-        - pOption：每个选项随时间变化的概率列表
-        - pOption0：选项0随时间变化的概率列表
-        - pOption1：选项1随时间变化的概率列表
-        - pOption2：选项2随时间变化的概率列表
-        - pOption3：选项3随时间变化的概率列表
-        - pOption4：选项4随时间变化的概率列表
+        - recorder：轨迹记录器（recorder.TrajectoryRecorder），由 reset() 创建（main() 会调用），之前为 None
+        - instrument：主循环计时器（instrument.Instrument），未启用时为 None
+        - convergence：收敛检测器（convergence.ConvergenceMonitor），未启用时为 None
+        - converged_epoch：收敛的轮次，未收敛时为 None
+        - epoch：已经进行的轮数，即下一轮的轮次
+        - pOption：每个选项随时间变化的概率，(NUM_OPTIONS, show) 数组视图
+        - pOption0：选项0随时间变化的概率
+        - pOption1：选项1随时间变化的概率
+        - pOption2：选项2随时间变化的概率
+        - pOption3：选项3随时间变化的概率
+        - pOption4：选项4随时间变化的概率
         - show：游戏展示次数
-        - avg_score：平均得分列表
+        - avg_score：平均得分，(show,) 数组视图
         - params：策略参数对象
+        - payoff_rows：当前得分配置下人数组合编码到每个选项得分的查找表，编码空间过大时为 None（逐轮计算）
+        - score_slots：(规则得分属性名, 选项下标) 元组，calc_scores 据此设置本轮的 cautious_score 等
+        - array_strategy：是否使用数组版本的策略
+        - log_space：是否在对数空间中保存概率
+        - types：人数大于 0 的玩家类型列表
+        - player_type：每个玩家所属类型在 types 中的下标
+        - type_weights：每种玩家类型占总人数的比例
+        - mixed：是否为混合人群（不全是“常人”）
+        - seed：本次运行的 SeedSequence，为 None 时使用全局随机数生成器
+        - rngs：每种玩家类型各自的 np.random.Generator（子流）
         """
 
-        # 存储每个选项随时间变化的概率的列表
-        self.pOption = []
-        self.pOption0 = []
-        self.pOption1 = []
-        self.pOption2 = []
-        self.pOption3 = []
-        self.pOption4 = []
-
-        # 计数
-        self.show = 0
-        self.avg_score = []
-
-        # 加载参数
-        self.params = Parameters(config_file)
-
-    def main(self):
+        # 加载参数，游戏过程中会修改 pList 等，因此总是使用副本
+        self.params = Parameters(config_file) if params is None else params.replace()
+
+        # 记录每个选项随时间变化的概率和平均得分，记录器在 main() 中创建
+        self.record_stride = record_stride
+        self.record_path = record_path
+        self.recorder = None
+
+        # 主循环计时器，只在 main(profile=True) 时启用
+        self.instrument = None
+        # 收敛检测器，每次 main() 重新创建
+        self.convergence = None
+        # 下一轮的轮次，从检查点恢复时不为 0
+        self.epoch = 0
+        self.payoff_rows = self._payoff_rows()  # 人数组合编码 → 每个选项得分
+        # 本轮各规则得分（cautious_score 等）取自哪个选项，按 [Q1] options 中的规则查找
+        self.score_slots = tuple((f'{kind}_score', option) for kind, option in self.params.option_index.items())
+
+        # 玩家类型：按 [PlayerTypes] 中的顺序依次分配给每个玩家
+        self.types = [name for name, count in self.params.player_types.items() if count > 0]
+        counts = np.array([self.params.player_types[name] for name in self.types])
+        self.player_type = np.repeat(np.arange(len(self.types)), counts)
+        self.type_weights = counts / self.params.NUM_PLAYERS
+        self.mixed = self.types != ['normal']
+        self.type_slices = [slice(start, stop) for start, stop in zip(np.cumsum(counts) - counts, np.cumsum(counts))]
+
+        # 随机数流：每种玩家类型使用本次运行的一个子流
+        self.seed = seeding.seed_sequence(self.params.SEED if seed is None else seed)
+        self.rngs = None if self.seed is None else [seeding.generator(self.seed, t) for t in range(len(self.types))]
+
+        # 策略实现，混合人群总是使用数组版本的策略
+        self.log_space = log_space
+        self.array_strategy = array_strategy or log_space or self.mixed
+        if self.mixed:
+            self.params.pMatrix = np.tile(np.asarray(self.params.pList, dtype=np.float64), (len(self.types), 1))
+            self.params.pList = self.type_weights @ self.params.pMatrix
+            if self.log_space:
+                self.params.log_pMatrix = np.log(self.params.pMatrix)
+        elif self.array_strategy:
+            self.params.pList = np.array(self.params.pList, dtype=np.float64)
+            if self.log_space:
+                self.params.log_pList = np.log(self.params.pList)
+
+    def main(self, progress=True, profile=False, convergence=None, resume=False, checkpoint_path=None, checkpoint_every=None,
+             profile_memory=True):
             """
             游戏主循环。
+
+            参数：
+            - progress：是否显示进度条
+            - profile：是否记录每轮各阶段的耗时和新分配的内存（tracemalloc），结果保存在 self.instrument（见 instrument.py）
+            - convergence：可选，收敛检测器（convergence.ConvergenceMonitor），默认按配置中的 [Convergence] 创建；
+              收敛且允许提前结束时不再进行剩余的轮次，收敛的轮次保存在 self.converged_epoch
+            - resume：是否从第 self.epoch 轮继续（见 from_checkpoint），沿用已有的轨迹和收敛检测器；为假时从第 0 轮开始
+            - checkpoint_path：可选，检查点文件路径，给出时每 checkpoint_every 轮以及结束时保存检查点（见 save_checkpoint）；
+              不给出时不保存，配置中的 [Checkpoint] 只由命令行入口使用
+            - checkpoint_every：保存检查点的间隔轮数，默认为 CHECKPOINT_EVERY
+            - profile_memory：profile 时是否统计内存；tracemalloc 会明显拖慢每一轮，只看耗时时设为假
             """
+            self.payoff_rows = self._payoff_rows()  # 得分配置可能已被修改，重新取得查找表
+            if not resume:
+                self.reset(convergence)
+            elif convergence is not None:
+                self.convergence = convergence
+            monitor = self.convergence
+
+            path = checkpoint_path
+            every = checkpoint_every or CHECKPOINT_EVERY
+
+            # 从已经收敛并提前结束的检查点恢复时不再继续
+            stop = self.epoch if monitor is not None and monitor.early_stop and monitor.converged else self.params.NUM_EPOCHS
+            self.instrument = Instrument(stop - self.epoch, memory=profile_memory) if profile else None
+            if self.instrument is not None:
+                self.instrument.start()
             while True:  # 游戏主循环
-                for i in tqdm.trange(self.params.NUM_EPOCHS):  # 游戏循环次数
-                    self.init_single_game()  # 初始化单个游戏的参数
-                    for norm in range(self.params.NUM_PLAYERS):
-                        self.normal_scheme["one"] = np.random.choice(self.params.NUM_OPTIONS, p=self.params.pList)  # 随机选择初始策略
-                        ans = self.normal_scheme["one"]
-                        self.params.ans_list[ans] += 1  # 更新每个选项选择的玩家数量
-                        self.params.crowds_ans.append(ans)  # 添加玩家答案到列表中
-                    self.calc_scores(self.params.ans_list, self.params.score_list)  # 根据玩家答案计算每个玩家的得分
-                    
-                    if self.params.NUM_EPOCHS <= 100:
-                        point_record = i
-                    else:
-                        point_record = self.params.NUM_EPOCHS // 100
-                    if (i+1) % (point_record+1) == 0:
-                        self.show += 1
-                        # 记录每个选项的概率
-                        self.pOption0.append(self.params.pList[0])
-                        self.pOption1.append(self.params.pList[1])
-                        self.pOption2.append(self.params.pList[2])
-                        self.pOption3.append(self.params.pList[3])
-                        self.pOption4.append(self.params.pList[4])
-                        self.pOption = [self.pOption0, self.pOption1, self.pOption2, self.pOption3, self.pOption4]
-                        self.avg_score.append(np.mean(self.params.score_list))  # 计算平均得分
-                        #print(i)
-
-                    # 更新参数
-                    self.params.iter = i
-                    self.params.pList = normal.norm_scheme_adjust(self.params, 1)  # 调整策略概率
+                try:
+                    for i in trange(self.epoch, stop, progress=progress):  # 游戏循环次数
+                        self.step(i)
+                        self.epoch = i + 1
+                        if monitor is not None and monitor.update(i, self.params.pList, sum(self.params.score_list) / self.params.NUM_PLAYERS):
+                            break  # 已收敛，提前结束
+                        if path is not None and self.epoch % every == 0:
+                            self.save_checkpoint(path)
+                finally:
+                    if self.instrument is not None:
+                        self.instrument.stop()
+                self.recorder.flush()
+                if path is not None:
+                    self.save_checkpoint(path)
                 break
+
+    def reset(self, convergence=None):
+        """
+        准备从第 0 轮开始游戏：创建轨迹记录器和收敛检测器。main() 会调用；
+        不通过 main() 而直接逐轮调用 step 时（例如跑分），需要先调用一次。
+
+        参数：
+        - convergence：可选，收敛检测器，默认按配置中的 [Convergence] 创建
+        """
+        self.epoch = 0
+        self.recorder = TrajectoryRecorder(self.params.NUM_EPOCHS, self.params.NUM_OPTIONS,
+                                           self.record_stride, path=self.record_path)
+        self.convergence = ConvergenceMonitor.from_params(self.params) if convergence is None else convergence
+
+    def save_checkpoint(self, path):
+        """
+        把当前的完整状态保存为检查点文件（见 checkpoint.py）：参数、当前概率、随机数生成器状态、轨迹和收敛检测器。
+        从检查点恢复后继续进行，结果与不中断的游戏完全相同。
+
+        参数：
+        - path：检查点文件路径（.npz）
+        """
+        state = {
+            'epoch': self.epoch,
+            'params': self.params.fields(),
+            'game': {'array_strategy': self.array_strategy, 'log_space': self.log_space},
+            'seed': None if self.seed is None else {'entropy': self.seed.entropy, 'spawn_key': list(self.seed.spawn_key),
+                                                    'pool_size': self.seed.pool_size},
+            'probabilities': {name: np.array(getattr(self.params, name), dtype=np.float64)
+                              for name in _STATE_FIELDS if hasattr(self.params, name)},
+            'rng': checkpoint.rng_state(self.rngs),
+            'recorder': self.recorder.state(),
+        }
+        if self.convergence is not None:
+            state['convergence'] = self.convergence.state()
+        checkpoint.write(path, state)
+
+    @classmethod
+    def from_checkpoint(cls, path, num_epochs=None, record_path=None):
+        """
+        从检查点文件恢复游戏，之后调用 main(resume=True) 继续。
+
+        没有配置种子的游戏使用 numpy 的全局随机数生成器，恢复时会把全局随机数生成器设为检查点中的状态。
+
+        参数：
+        - path：检查点文件路径
+        - num_epochs：可选，新的游戏循环次数，大于原来的循环次数时延长游戏（轨迹记录间隔不变）
+        - record_path：可选，轨迹的内存映射目录，默认沿用原来的目录；给出原来的目录时以读写方式重新打开，已有的记录保留
+
+        返回：
+        - 恢复了状态的 Game 对象
+        """
+        state = checkpoint.read(path)
+        params = Parameters.from_fields(state['params'])
+        params.pList = state['probabilities']['pList'].tolist()  # 构造 Game 时需要，之后按保存的状态覆盖
+        if num_epochs is not None:
+            if num_epochs < state['epoch']:
+                raise ValueError(f"检查点已经进行了 {state['epoch']} 轮，循环次数 {num_epochs} 太少了QAQ")
+            params = params.replace(NUM_EPOCHS=num_epochs)
+        seed = state['seed']
+        if seed is not None:
+            seed = np.random.SeedSequence(seed['entropy'], spawn_key=tuple(seed['spawn_key']), pool_size=seed['pool_size'])
+        game = cls(None, params=params, seed=seed, record_path=record_path, **state['game'])  # 构造时不打开轨迹目录
+
+        for name, value in state['probabilities'].items():
+            setattr(game.params, name, value if game.array_strategy else value.tolist())
+        checkpoint.set_rng_state(game.rngs, state['rng'])
+        game.recorder = TrajectoryRecorder.restore(state['recorder'], params.NUM_EPOCHS, params.NUM_OPTIONS, path=record_path)
+        game.record_stride = game.recorder.stride
+        if 'convergence' in state:
+            game.convergence = ConvergenceMonitor.restore(state['convergence'])
+        game.epoch = state['epoch']
+        return game
+
+    def _payoff_rows(self):
+        """当前得分配置的查找表（见 payoff.payoff_table 的 rows），玩家太多、编码空间过大时为 None。"""
+        table = payoff_table(self.params)
+        return None if table is None else table[3]
+
+    @property
+    def converged_epoch(self):
+        """收敛的轮次（从 0 开始），没有检测或未收敛时为 None。"""
+        return None if self.convergence is None else self.convergence.converged_epoch
+
+    def step(self, i):
+        """
+        进行第 i 轮游戏：作答、计分、记录并调整策略。
+        """
+        if self.instrument is not None:
+            return self._step_instrumented(i)
+        self.init_single_game()  # 初始化单个游戏的参数
+        self.sample_players()  # 所有玩家按各自类型的概率同时作答
+        self.calc_scores(self.params.ans_list, self.params.score_list)  # 根据玩家答案计算每个玩家的得分
+
+        if self.recorder.due(i):
+            # 记录每个选项的概率和平均得分
+            self.recorder.record(self.params.pList, np.mean(self.params.score_list))
+
+        # 更新参数
+        self.params.iter = i
+        self.adjust_strategies()  # 调整策略概率
+
+    def _step_instrumented(self, i):
+        """
+        与 step 相同，但记录各阶段的耗时和本轮新分配的内存。
+        时间戳直接写入计时器预分配的数组，begin() 和 end() 之间计时本身不分配内存。
+        """
+        stamps = self.instrument.begin()
+        stamps[0] = clock()
+        self.init_single_game()
+        self.sample_players()
+        stamps[1] = clock()
+        self.calc_scores(self.params.ans_list, self.params.score_list)
+        stamps[2] = clock()
+        if self.recorder.due(i):
+            self.recorder.record(self.params.pList, np.mean(self.params.score_list))
+        stamps[3] = clock()
+        self.params.iter = i
+        self.adjust_strategies()
+        stamps[4] = clock()
+        self.instrument.end()
+
+    @property
+    def show(self):
+        return 0 if self.recorder is None else self.recorder.show
+
+    @property
+    def pOption(self):
+        if self.recorder is None:
+            return np.empty((self.params.NUM_OPTIONS, 0))
+        return self.recorder.pOption.T
+
+    @property
+    def avg_score(self):
+        return np.empty(0) if self.recorder is None else self.recorder.avg_score
+
+    pOption0 = property(lambda self: self.pOption[0])
+    pOption1 = property(lambda self: self.pOption[1])
+    pOption2 = property(lambda self: self.pOption[2])
+    pOption3 = property(lambda self: self.pOption[3])
+    pOption4 = property(lambda self: self.pOption[4])
     
     def init_single_game(self):
         """
         初始化单个游戏的参数。
         """
-        self.normal_scheme = {"one":None}  # 初始策略
         self.params.ans_list = [0] * self.params.NUM_OPTIONS  # 每个选项选择的玩家数量
         self.params.crowds_ans= []  # 玩家答案列表
         self.params.score_list = [0] * self.params.NUM_PLAYERS  # 玩家得分列表
         [i / sum(self.params.pList) for i in self.params.pList] # 归一化概率
 
+    def probability_matrix(self):
+        """
+        返回 (玩家类型数, 选项数) 的概率矩阵，每一行是一种玩家类型当前的选择概率。
+        """
+        if self.mixed:
+            return self.params.pMatrix
+        return np.asarray(self.params.pList, dtype=np.float64)[None, :]
+
+    def sample_players(self):
+        """
+        所有玩家按各自类型的概率一次性作答。
+
+        与 np.random.choice 相同，每个玩家消耗一个均匀随机数并在归一化的累积概率上查找，
+        因此使用全局随机数生成器且全部为“常人”时，与逐个调用 np.random.choice 的结果完全相同。
+        配置了种子时，每种玩家类型的均匀随机数取自该类型自己的子流。
+        """
+        cdf = np.cumsum(self.probability_matrix(), axis=1)
+        cdf /= cdf[:, -1:]
+        if self.rngs is None:
+            u = np.random.random_sample(self.params.NUM_PLAYERS)
+        else:
+            u = np.empty(self.params.NUM_PLAYERS)
+            for rng, players in zip(self.rngs, self.type_slices):
+                u[players] = rng.random(players.stop - players.start)
+        crowds_ans = (cdf[self.player_type] <= u[:, None]).sum(axis=1)
+        self.params.crowds_ans = crowds_ans.tolist()  # 玩家答案列表
+        self.params.ans_list = np.bincount(crowds_ans, minlength=self.params.NUM_OPTIONS).tolist()  # 每个选项选择的玩家数量
+
+    def adjust_strategies(self):
+        """
+        根据本轮结果调整策略概率。
+
+        混合人群中每种玩家类型保存自己的概率（pMatrix 的一行），并通过策略注册表一次调整该类型的所有玩家；
+        调整后 pList 为按人数加权的人群平均概率。
+        """
+        if self.mixed:
+            for t, name in enumerate(self.types):
+                self.params.pList = self.params.pMatrix[t]
+                if self.log_space:
+                    self.params.log_pList = self.params.log_pMatrix[t]
+                STRATEGIES[name](self.params, 1, self.log_space)  # 原地调整该类型的概率
+            self.params.pList = self.type_weights @ self.params.pMatrix
+        elif self.array_strategy:
+            normal.norm_scheme_adjust_array(self.params, 1, self.log_space)  # 原地调整策略概率
+        else:
+            self.params.pList = normal.norm_scheme_adjust(self.params, 1)  # 调整策略概率
+
 
     def calc_scores(self, ans_list, score_list):
         """
@@ -281,100 +787,144 @@ class Game:
         - ans_list：每个选项选择的玩家数量列表
         - score_list：玩家得分列表
         """
-        count_que1 = ans_list[2] >= max(ans_list)
-        count_que2 = ans_list[3] <= min(ans_list)
-
-        # 计算本轮游戏应得分数
-        self.cautious_score = self.params.cautious_score
-        self.fairness_score = self.params.fairness_score / ans_list[1] if ans_list[1] != 0 else 0
-        self.solidarity_score = 0 if not count_que1 else self.params.solidarity_score
-        self.wisdom_score = 0 if not count_que2 else self.params.wisdom_score
-        self.bravery_score = 0 if ans_list[4] != 1 else self.params.bravery_score
+        # 按人数组合的编码从查找表中取出本轮每个选项应得分数，没有查找表时直接计算
+        if self.payoff_rows is None:
+            payoff = tuple(option_payoffs(ans_list, self.params).tolist())
+        else:
+            radix = self.params.NUM_PLAYERS + 1
+            code = 0
+            for count in reversed(ans_list):
+                code = code * radix + count
+            payoff = self.payoff_rows[code]
+        for name, option in self.score_slots:
+            setattr(self, name, payoff[option])
 
         # 计算每个玩家的得分
-        for i, ans in enumerate(self.params.crowds_ans):
-            if ans == 0:  # 谨慎
-                score_list[i] = self.cautious_score
-            elif ans == 1:  # 公平
-                score_list[i] = self.fairness_score
-            elif ans == 2:  # 团结
-                score_list[i] = self.solidarity_score
-            elif ans == 3:  # 智慧
-                score_list[i] = self.wisdom_score
-            elif ans == 4:  # 勇气
-                score_list[i] = self.bravery_score
-
-    def graph(self):
-        """
-        绘制每个选项随时间变化的概率图。
-        """
-        X = np.linspace(1, self.show, self.show)
-        plt.plot(X, self.pOption[0], label = "谨慎")
-        plt.plot(X, self.pOption[1], label = "公平")
-        plt.plot(X, self.pOption[2], label = "团结")
-        plt.plot(X, self.pOption[3], label = "智慧")
-        plt.plot(X, self.pOption[4], label = "勇气")
-        plt.ylabel("概率")
-        plt.legend(loc="upper right")
+        score_list[:] = [payoff[ans] for ans in self.params.crowds_ans]
+
+    def graph(self, path=None):
+        """
+        绘制每个选项随时间变化的概率图，长轨迹按像素列做最小/最大值抽稀（见 render.py）。
+
+        参数：
+        - path：可选，图片路径（.png、.svg 等）；给出时不打开窗口，直接保存到文件，可在没有图形界面的环境中使用
+        """
+        import render
+        runs = np.asarray(self.pOption).T[None]
+        labels = render.option_labels(self.params.options)
+        if path is not None:
+            return render.save(runs, path, labels, stride=self.recorder.stride)
+        plt = pyplot()
+        fig, ax = plt.subplots()
+        render.draw(ax, runs, labels, stride=self.recorder.stride)
         plt.show()
 
-def benchmark_brief(iter):
+def simulate(config_file=None, params=None, seed=None, **kwargs):
+    """
+    无界面的库入口：运行一局完整的游戏并返回 Game 对象，不显示进度条、不画图、不修改全局随机数状态
+    （配置中没有 SEED 且没有给出 seed 时除外，此时沿用 numpy 的全局随机数生成器）。
+
+    参数：
+    - config_file：配置文件路径，给出 params 时可为 None
+    - params：可选，已加载的参数对象（不会被修改，可以重复传入）
+    - seed：可选，根随机种子
+    - kwargs：传给 Game 的其他参数，例如 array_strategy、record_stride
     """
-    用于性能跑分
+    game = Game(config_file, params=params, seed=seed, **kwargs)
+    game.main(progress=False)
+    return game
+
+def benchmark_brief(iter, params=None):
+    """
+    用于性能跑分：实际运行 iter 轮游戏，返回每轮耗时（秒）。
+
+    参数：
+    - iter：跑分的轮数
+    - params：可选，跑分使用的参数对象（会被复制，不会被修改），默认读取 normal.ini
+
+    跑分不保存检查点，也不做收敛检测：收敛后提前结束会让估计的每轮耗时偏低。
     """
     import time
-    test_array = np.random.randint(0, 100000, iter*2000)
-    start = time.time()
-    test_array.sort()
-    end = time.time()
-    # print((end-start))
+    params = (Parameters('normal.ini') if params is None else params).replace(NUM_EPOCHS=iter, convergence=None)
+    game = Game(None, params=params, seed=0)  # 使用独立的随机数流，不影响全局随机数生成器
+    start = time.perf_counter()
+    game.main(progress=False)
+    end = time.perf_counter()
     return (end-start)/iter
 
 def benchmark_brief_debug():
     """
-    用于开发者测试性能。
+    用于开发者测试性能：比较 benchmark_brief 估计的耗时与实际游戏耗时。
+    完整的跑分见 benchmarks/bench_epoch.py。
     """
+    import time
     SCORE = benchmark_brief(iter=5000)
     game_time = []
-    test_time = []
-    # 随机生成一个长度为100000的列表，列表中的每个元素都是0到100000之间的随机整数，确定随机种子
-    import time
+    predict_time = []
 
-    game = Game('normal.ini')
-    for i in tqdm.trange(2000, 2010):
+    params = Parameters('normal.ini')
+    for i in trange(2000, 2010):
+        game = Game(None, params=params.replace(NUM_EPOCHS=i))
         start = time.time()
-        game.params.NUM_EPOCHS = i
-        game.main()
+        game.main(progress=False)
         end = time.time()
         game_time.append(end-start)
+        predict_time.append(SCORE * i)
 
-    for i in tqdm.trange(2000, 2010):
-        start = time.time()
-        test_array = np.random.randint(0, 100000, i*2000)
-        test_array.sort()
-        end = time.time()
-        test_time.append(end-start)
-
-    #计算game_time，test_time相关系数
-    print(np.corrcoef(game_time, test_time))
+    #计算预计耗时的相对误差
+    print(f"预计耗时的平均相对误差 {np.mean(np.abs(np.array(predict_time) / game_time - 1)):.2%}")
 
+    plt = pyplot()
     plt.plot(game_time, label = "游戏")
-    plt.plot(test_time, label = "测试")
+    plt.plot(predict_time, label = "预计")
     plt.ylabel("时间")
     plt.legend(loc="upper right")
     plt.show()
 
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="第一题博弈模拟")
+    parser.add_argument('--config', default='normal.ini', help="游戏配置文件")
+    parser.add_argument('--profile', action='store_true', help="统计主循环各阶段的耗时和新分配的内存")
+    parser.add_argument('--profile-time-only', action='store_true', help="与 --profile 一起使用，只统计耗时（不启用 tracemalloc）")
+    parser.add_argument('--tolerance', type=float, default=None, help="收敛检测的概率漂移容差，收敛后提前结束")
+    parser.add_argument('--window', type=int, default=CONVERGENCE_DEFAULTS['window'], help="收敛检测的窗口长度")
+    parser.add_argument('--checkpoint', default=None, help="检查点文件路径，默认为配置中的 [Checkpoint] PATH")
+    parser.add_argument('--checkpoint-every', type=int, default=None, help="保存检查点的间隔轮数，默认为配置中的 [Checkpoint] EVERY")
+    parser.add_argument('--resume', default=None, metavar='CHECKPOINT', help="从检查点继续游戏，之后的检查点默认也保存到这个文件")
+    parser.add_argument('--epochs', type=int, default=None, help="从检查点继续时的新循环次数，用于延长游戏")
+    parser.add_argument('--plot', default=None, metavar='PATH', help="把概率图保存到文件（.png、.svg 等），不打开窗口")
+    args = parser.parse_args()
+
+    print("加载游戏模块...")
+    # 随机数由配置中的 [Game] SEED 决定（见 seeding.py），不设置 numpy 的全局种子；
+    # 配置了 SEED 时结果可复现，但与旧版本 np.random.seed(3407) 下的结果不同，未配置时每次运行结果不同
     is_benchmark_debug = False
     if not is_benchmark_debug:
-        print("测试性能")
-        SCORE = benchmark_brief(iter=5000)
         print("加载游戏配置")
-        game = Game('normal.ini')
+        if hasattr(os, 'startfile'):  # _p5af37c 依赖 os.startfile，只在 Windows 上可用
+            from _p5af37c import wtf
+            wtf(args.config)
+        if args.resume:
+            game = Game.from_checkpoint(args.resume, num_epochs=args.epochs)
+            print(f"从第 {game.epoch} 轮继续")
+        else:
+            game = Game(args.config)
         #benchmark(game.params.NUM_EPOCHS)
         print("进行游戏模拟...")
-        game.main()
+        monitor = None
+        if args.tolerance is not None:
+            monitor = ConvergenceMonitor(game.params.NUM_OPTIONS, window=args.window, tolerance=args.tolerance)
+        config = game.params.checkpoint or {}  # 只有命令行入口按配置中的 [Checkpoint] 保存检查点
+        game.main(profile=args.profile, convergence=monitor, resume=bool(args.resume),
+                  checkpoint_path=args.checkpoint or args.resume or config.get('path'),
+                  checkpoint_every=args.checkpoint_every or config.get('every'),
+                  profile_memory=not args.profile_time_only)
+        if args.profile:
+            print(game.instrument.report())
+        if game.convergence is not None:
+            print("收敛轮次", game.converged_epoch)
 
         print("得分", game.params.score_list)
         print("选项", game.params.ans_list)
@@ -383,6 +933,6 @@ if __name__ == "__main__":
         print(f"均分{np.mean(game.avg_score):.4f}")
         print(" ")
         #print("没有人选择“勇气”的比例", round(game.count_brave/game.NUM_EPOCHS*100, 2), "%")
-        game.graph()
+        game.graph(args.plot)
     else:
         benchmark_brief_debug()
\ No newline at end of file
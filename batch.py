@@ -0,0 +1,216 @@
+# -*- coding: UTF-8 -*-
+# batch.py
+# Python 3.8.10
+
+import numpy as np
+
+import seeding
+from Game import Parameters
+from display import trange
+from payoff import lookup_payoffs, lookup_totals
+from recorder import TrajectoryRecorder
+from strategies import normal
+
+
+MODES = ('players', 'counts')
+
+
+class BatchGame:
+    def __init__(self, config_file, num_replicas, mode='players', params=None, seed=None,
+                 record_stride=None, record_path=None):
+        """
+        初始化批量游戏对象，同时模拟 num_replicas 局互相独立的第一题游戏。
+
+        参数：
+        - config_file：配置文件路径
+        - num_replicas：同时进行的独立游戏局数 R
+        - mode：抽样模式
+            - 'players'：逐玩家抽样，R=1 时与 Game.main 逐位相同
+            - 'counts'：仅计数模式，每轮只抽取每个选项的人数（多项分布），
+              每轮开销与玩家数量无关，只与选项数量有关
+        - params：可选，已加载的参数对象；给出时不再读取 config_file。游戏使用它的副本，不会修改它
+        - seed：可选，这一批游戏的随机种子（int 或 np.random.SeedSequence），默认为配置中的 SEED；
+          两者都没有时使用 numpy 的全局随机数生成器。一批中的 R 局共用同一个随机数流，
+          需要更多相互独立的批次时，用 seeding.child(root, k) 为第 k 批派生种子
+        - record_stride：轨迹记录间隔，默认约记录 100 次，为 1 时记录每一轮
+        - record_path：可选，把轨迹写入该目录下的内存映射 .npy 文件；轨迹过大时也会自动写入临时目录，
+          临时目录在 recorder.close() 或记录器被回收时删除
+
+        属性：
+        - num_replicas：独立游戏局数 R
+        - mode：抽样模式
+        - rng：这一批游戏使用的随机数生成器
+        - params：策略参数对象，其中 pList、ans_list 为 (R, NUM_OPTIONS) 数组；
+          逐玩家模式下 crowds_ans、score_list 为 (R, NUM_PLAYERS) 数组，
+          仅计数模式下二者为 None，改为记录 option_payoff、option_scores (R, NUM_OPTIONS) 和 best_option (R,)
+        - recorder：轨迹记录器（recorder.TrajectoryRecorder），由 reset() 创建（main() 会调用），之前为 None
+        - pOption：每局每个选项随时间变化的概率，(show, R, NUM_OPTIONS) 数组视图
+        - show：记录次数
+        - avg_score：每局平均得分随时间的变化，(show, R) 数组视图
+        """
+        if mode not in MODES:
+            raise ValueError(f"未知的抽样模式 {mode}，可选 {MODES}")
+        self.num_replicas = num_replicas
+        self.mode = mode
+        self.record_stride = record_stride
+        self.record_path = record_path
+
+        # 加载参数（总是使用副本），并把单局参数扩展为 R 局
+        self.params = Parameters(config_file) if params is None else params.replace()
+        if any(count > 0 for name, count in self.params.player_types.items() if name != 'normal'):
+            raise ValueError("批量引擎目前只支持全部为“常人”的人群，混合人群请使用 Game")
+        seed = seeding.seed_sequence(self.params.SEED if seed is None else seed)
+        self.rng = np.random if seed is None else seeding.generator(seed)
+
+        # 记录每个选项随时间变化的概率和平均得分，记录器在 main() 中创建
+        self.recorder = None
+        self.params.pList = np.tile(np.asarray(self.params.pList, dtype=np.float64), (num_replicas, 1))
+
+    def main(self, progress=True):
+        """
+        批量游戏主循环，每轮对所有局的所有玩家只进行一次向量化抽样。
+
+        参数：
+        - progress：是否显示进度条
+        """
+        params = self.params
+        self.reset()
+        for i in trange(params.NUM_EPOCHS, progress=progress):  # 游戏循环次数
+            self.step(i)
+        self.recorder.flush()
+
+    def step(self, i):
+        """
+        进行第 i 轮游戏：作答、计分、记录并调整策略。
+        """
+        params = self.params
+        self.init_single_game()  # 初始化单轮游戏的参数
+        if self.mode == 'counts':
+            self.sample_counts()  # 直接抽取每个选项的人数
+            self.calc_option_scores()  # 根据人数计算每个选项的得分
+        else:
+            self.sample_players()  # 所有玩家同时作答
+            self.calc_scores()  # 根据玩家答案计算每个玩家的得分
+
+        if self.recorder.due(i):
+            # 记录每个选项的概率和平均得分
+            self.recorder.record(params.pList, self.mean_scores())
+
+        # 更新参数
+        params.iter = i
+        params.pList = normal.norm_scheme_adjust_batch(params, 1)  # 调整策略概率
+
+    def reset(self):
+        """
+        准备从第 0 轮开始游戏：按当前的 NUM_EPOCHS 创建轨迹记录器。main() 会调用；
+        不通过 main() 而直接逐轮调用 step 时（例如跑分），需要先调用一次。
+        """
+        self.recorder = TrajectoryRecorder(self.params.NUM_EPOCHS, self.params.NUM_OPTIONS, self.record_stride,
+                                           shape=(self.num_replicas,), path=self.record_path)
+
+    @property
+    def show(self):
+        return 0 if self.recorder is None else self.recorder.show
+
+    @property
+    def pOption(self):
+        if self.recorder is None:
+            return np.empty((0, self.num_replicas, self.params.NUM_OPTIONS))
+        return self.recorder.pOption
+
+    @property
+    def avg_score(self):
+        return np.empty((0, self.num_replicas)) if self.recorder is None else self.recorder.avg_score
+
+    def graph(self, path, quantiles=None):
+        """
+        把所有局的概率轨迹画成分位数色带并保存到文件（见 render.py）。
+
+        参数：
+        - path：图片路径（.png、.svg 等）
+        - quantiles：可选，画出的分位数，默认为 render.QUANTILES
+        """
+        import render
+        runs = np.transpose(self.pOption, (1, 0, 2))  # (R, show, NUM_OPTIONS)
+        return render.save(runs, path, render.option_labels(self.params.options), stride=self.recorder.stride,
+                           quantiles=quantiles or render.QUANTILES)
+
+    def init_single_game(self):
+        """
+        初始化单轮游戏的参数。
+        """
+        R = self.num_replicas
+        self.params.ans_list = np.zeros((R, self.params.NUM_OPTIONS), dtype=np.int64)  # 每个选项选择的玩家数量
+        if self.mode == 'counts':
+            self.params.crowds_ans = None
+            self.params.score_list = None
+            self.params.option_payoff = np.zeros((R, self.params.NUM_OPTIONS), dtype=np.float64)  # 每个选项的单人得分
+            self.params.option_scores = np.zeros((R, self.params.NUM_OPTIONS), dtype=np.float64)  # 每个选项的总得分
+            self.params.best_option = np.zeros(R, dtype=np.int64)  # 得分最高的玩家所选的选项
+        else:
+            self.params.crowds_ans = np.zeros((R, self.params.NUM_PLAYERS), dtype=np.int64)  # 玩家答案
+            self.params.score_list = np.zeros((R, self.params.NUM_PLAYERS), dtype=np.float64)  # 玩家得分
+
+    def sample_players(self):
+        """
+        按 pList 为每局的每个玩家抽取答案。
+
+        与 np.random.choice 相同，每个玩家消耗一个均匀随机数并在归一化的累积概率上查找，
+        因此使用全局随机数生成器且 R=1 时，与 Game.main 在同一全局种子下得到完全相同的答案序列。
+        """
+        params = self.params
+        cdf = np.cumsum(params.pList, axis=1)
+        cdf /= cdf[:, -1:]
+        u = self.rng.random((self.num_replicas, params.NUM_PLAYERS))
+        params.crowds_ans = (cdf[:, None, :] <= u[:, :, None]).sum(axis=2)
+        params.ans_list = (params.crowds_ans[:, :, None] == np.arange(params.NUM_OPTIONS)).sum(axis=1)
+
+    def calc_scores(self):
+        """
+        根据每局玩家答案计算每个玩家的得分。
+        """
+        payoff = lookup_payoffs(self.params.ans_list, self.params)
+        self.params.score_list = np.take_along_axis(payoff, self.params.crowds_ans, axis=1)
+
+    def sample_counts(self):
+        """
+        仅计数模式：按 pList 一次性抽取每局每个选项的人数。
+
+        多项分布通过逐选项的条件二项分布抽取，每轮只需 NUM_OPTIONS - 1 次向量化调用。
+        """
+        params = self.params
+        pList = params.pList
+        tail = np.cumsum(pList[:, ::-1], axis=1)[:, ::-1]  # 剩余选项的概率和
+        remaining = np.full(self.num_replicas, params.NUM_PLAYERS, dtype=np.int64)
+        for option in range(params.NUM_OPTIONS - 1):
+            p = np.where(tail[:, option] > 0, pList[:, option] / np.where(tail[:, option] > 0, tail[:, option], 1), 0)
+            count = self.rng.binomial(remaining, np.clip(p, 0, 1))
+            params.ans_list[:, option] = count
+            remaining -= count
+        params.ans_list[:, -1] = remaining
+
+    def calc_option_scores(self):
+        """
+        仅计数模式：根据每个选项的人数计算每个选项的单人得分和总得分，并确定得分最高的玩家所选的选项。
+
+        玩家之间相互独立且顺序随机，因此“第一个得分最高的玩家”落在各个得分最高选项上的概率
+        与该选项的人数成正比，这里按此比例抽取。总得分与逐玩家模式一样逐次累加（见 payoff.option_totals），
+        因此有得分查找表时与逐玩家模式在分布上等价；玩家过多、没有查找表时总得分为 人数 * 单人得分，
+        浮点舍入可能使“总得分最高的选项”是否并列与逐玩家模式不同。
+        """
+        params = self.params
+        params.option_payoff = lookup_payoffs(params.ans_list, params)
+        params.option_scores = lookup_totals(params.ans_list, params, params.option_payoff)
+        chosen = params.ans_list > 0
+        top = np.where(chosen, params.option_payoff, -np.inf).max(axis=1, keepdims=True)
+        weights = np.cumsum(np.where(chosen & (params.option_payoff == top), params.ans_list, 0), axis=1)
+        u = self.rng.random(self.num_replicas) * weights[:, -1]
+        params.best_option = (weights <= u[:, None]).sum(axis=1)
+
+    def mean_scores(self):
+        """
+        返回每局本轮的平均得分，形状为 (R,)。
+        """
+        if self.mode == 'counts':
+            return self.params.option_scores.sum(axis=1) / self.params.NUM_PLAYERS
+        return self.params.score_list.mean(axis=1)
@@ -0,0 +1,186 @@
+# -*- coding: UTF-8 -*-
+# bench_epoch.py
+# Python 3.8.10
+#
+# 游戏主循环的跑分：直接测量配置加载、Game.main、calc_scores、norm_scheme_adjust 和不同人数下的每轮耗时，
+# 报告每轮耗时的分位数和每秒轮数，并可保存为 JSON 基线供之后比较，以发现主循环的性能退化。
+# 用法（在仓库根目录下运行）：
+#   python benchmarks/bench_epoch.py --save baseline.json
+#   python benchmarks/bench_epoch.py --compare baseline.json --tolerance 0.25
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Game as Game_module
+from Game import Game, Parameters
+from population import PopulationGame
+from strategies import normal
+
+
+def summarize(latencies):
+    """
+    汇总一组耗时（秒）：平均值、分位数和每秒次数。
+    """
+    latencies = np.asarray(latencies, dtype=np.float64)
+    return {
+        'n': int(len(latencies)),
+        'mean': float(latencies.mean()),
+        'p50': float(np.percentile(latencies, 50)),
+        'p90': float(np.percentile(latencies, 90)),
+        'p99': float(np.percentile(latencies, 99)),
+        'per_sec': float(1 / latencies.mean()),
+    }
+
+
+def timed_blocks(func, repeat, block=100):
+    """
+    调用 func 共 repeat * block 次，返回每次调用的耗时，每 block 次计时一次以减小计时开销。
+    """
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(block):
+            func()
+        latencies.append((time.perf_counter() - start) / block)
+    return latencies
+
+
+def warm_game(params, epochs=50, **kwargs):
+    """返回先运行了 epochs 轮、处于一般状态的游戏。"""
+    game = Game(None, params=params.replace(), seed=0, **kwargs)
+    game.reset()
+    for i in range(epochs):
+        game.step(i)
+    return game
+
+
+def bench_config(config_file, repeat, cached):
+    """加载配置的耗时；cached 为假时每次先清空配置缓存，测量解析 ini 文件的耗时。"""
+    latencies = []
+    Parameters(config_file)
+    for _ in range(repeat):
+        if not cached:
+            Game_module._config_cache.clear()
+        start = time.perf_counter()
+        Parameters(config_file)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def bench_main(params, num_epochs):
+    """Game.main 的总耗时换算为每秒轮数，另逐轮调用 step 得到每轮耗时的分布。"""
+    params = params.replace(NUM_EPOCHS=num_epochs)
+    game = Game(None, params=params.replace(), seed=0)
+    start = time.perf_counter()
+    game.main(progress=False)
+    total = time.perf_counter() - start
+
+    game = Game(None, params=params, seed=0)
+    game.reset()
+    latencies = []
+    for i in range(num_epochs):
+        start = time.perf_counter()
+        game.step(i)
+        latencies.append(time.perf_counter() - start)
+    result = summarize(latencies)
+    result['per_sec'] = num_epochs / total
+    return result
+
+
+def bench_calc_scores(params, repeat):
+    game = warm_game(params)
+    return summarize(timed_blocks(lambda: game.calc_scores(game.params.ans_list, game.params.score_list), repeat))
+
+
+def bench_adjust(params, repeat, array_strategy):
+    game = warm_game(params, array_strategy=array_strategy)
+    if array_strategy:
+        return summarize(timed_blocks(lambda: normal.norm_scheme_adjust_array(game.params, 1), repeat))
+    return summarize(timed_blocks(lambda: setattr(game.params, 'pList', normal.norm_scheme_adjust(game.params, 1)), repeat))
+
+
+def bench_population(config_file, num_players, num_epochs):
+    game = PopulationGame(config_file, num_players, seed=0)
+    game.reset()
+    latencies = []
+    for i in range(num_epochs):
+        start = time.perf_counter()
+        game.step(i)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def run(config_file, epochs, players, repeat):
+    params = Parameters(config_file)
+    results = {'config_load': bench_config(config_file, max(repeat // 10, 5), cached=False),
+               'config_load_cached': bench_config(config_file, repeat, cached=True)}
+    for num_epochs in epochs:
+        results[f'game_main/epochs={num_epochs}'] = bench_main(params, num_epochs)
+    results['calc_scores'] = bench_calc_scores(params, repeat)
+    results['norm_scheme_adjust'] = bench_adjust(params, repeat, array_strategy=False)
+    results['norm_scheme_adjust_array'] = bench_adjust(params, repeat, array_strategy=True)
+    for num_players in players:
+        results[f'population_step/players={num_players}'] = bench_population(config_file, num_players, max(epochs))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    与基线比较每项的 p50 耗时，返回超过 (1 + tolerance) 倍的项目列表。
+    """
+    regressions = []
+    print(f"{'项目':<40} {'基线 p50':>12} {'本次 p50':>12} {'比值':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['p50'] / baseline[name]['p50']
+        flag = " <-- 退化" if ratio > 1 + tolerance else ""
+        print(f"{name:<40} {baseline[name]['p50'] * 1e6:10.2f}us {result['p50'] * 1e6:10.2f}us {ratio:8.2f}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="游戏主循环跑分")
+    parser.add_argument('--config', default='normal.ini', help="游戏配置文件")
+    parser.add_argument('--epochs', default='100,1000,5000', help="Game.main 的循环次数，用逗号分隔")
+    parser.add_argument('--players', default='10,1000,100000', help="大规模引擎的玩家数量，用逗号分隔")
+    parser.add_argument('--repeat', type=int, default=200, help="微基准的计时次数（每次 100 个调用）")
+    parser.add_argument('--save', default=None, help="把结果保存为 JSON 基线")
+    parser.add_argument('--compare', default=None, help="与 JSON 基线比较")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="允许的 p50 耗时增幅")
+    args = parser.parse_args()
+
+    epochs = [int(x) for x in args.epochs.split(',')]
+    players = [int(x) for x in args.players.split(',')]
+    results = run(args.config, epochs, players, args.repeat)
+
+    print(f"{'项目':<40} {'p50':>10} {'p90':>10} {'p99':>10} {'次/秒':>12}")
+    for name, r in results.items():
+        print(f"{name:<40} {r['p50'] * 1e6:8.2f}us {r['p90'] * 1e6:8.2f}us {r['p99'] * 1e6:8.2f}us {r['per_sec']:12.1f}")
+
+    if args.save:
+        meta = {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+                'time': time.strftime('%Y-%m-%d %H:%M:%S')}
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'meta': meta, 'results': results}, f, ensure_ascii=False, indent=2)
+        print("基线已保存到", args.save)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
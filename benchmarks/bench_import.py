@@ -0,0 +1,95 @@
+# -*- coding: UTF-8 -*-
+# bench_import.py
+# Python 3.8.10
+#
+# 启动耗时跑分：在全新的解释器中导入各个模块，测量导入耗时，
+# 并检查导入是否加载了 matplotlib、tqdm 等重型依赖、是否修改了 numpy 的全局随机数状态。
+# 扫描等场景下每个工作进程都要付出这些开销，超过限制时以状态码 1 退出。
+# 用法（在仓库根目录下运行）：
+#   python benchmarks/bench_import.py
+#   python benchmarks/bench_import.py --modules Game,sweep --max-ms 300
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 作为库导入时不应加载的模块
+HEAVY = ('matplotlib', 'tqdm', '_p5af37c')
+
+# 在子进程中运行：先导入 numpy（基线），再计时导入目标模块
+PROBE = """
+import json, sys, time
+import numpy as np
+state = np.random.get_state()[1].copy()
+baseline = set(sys.modules)
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'import': elapsed,
+    'loaded': sorted(m for m in {heavy!r} if m in sys.modules),
+    'new_modules': len(set(sys.modules) - baseline),
+    'rng_changed': bool((np.random.get_state()[1] != state).any()),
+}}))
+"""
+
+
+def probe(module):
+    """在全新的解释器中导入 module 一次，返回测量结果字典（含解释器启动在内的总耗时 'total'）。"""
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY)],
+                            cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    total = time.perf_counter() - start
+    result = json.loads(output.strip().splitlines()[-1])
+    result['total'] = total
+    return result
+
+
+def bench_module(module, repeat):
+    results = [probe(module) for _ in range(repeat)]
+    imports = np.array([r['import'] for r in results])
+    totals = np.array([r['total'] for r in results])
+    return {
+        'import_p50': float(np.percentile(imports, 50)),
+        'import_min': float(imports.min()),
+        'total_p50': float(np.percentile(totals, 50)),
+        'new_modules': results[-1]['new_modules'],
+        'loaded': results[-1]['loaded'],
+        'rng_changed': any(r['rng_changed'] for r in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模块导入耗时跑分")
+    parser.add_argument('--modules', default='Game,batch,population,exact,sweep', help="要测量的模块，用逗号分隔")
+    parser.add_argument('--repeat', type=int, default=10, help="每个模块的测量次数")
+    parser.add_argument('--max-ms', type=float, default=None, help="导入耗时（p50，不含 numpy）的上限，单位毫秒")
+    args = parser.parse_args()
+
+    failed = []
+    print(f"{'模块':<16} {'导入 p50':>10} {'导入 min':>10} {'进程 p50':>10} {'新模块':>8}  问题")
+    for module in args.modules.split(','):
+        r = bench_module(module, args.repeat)
+        problems = [f"加载了 {m}" for m in r['loaded']]
+        if r['rng_changed']:
+            problems.append("修改了全局随机数状态")
+        if args.max_ms is not None and r['import_p50'] * 1e3 > args.max_ms:
+            problems.append(f"超过 {args.max_ms}ms")
+        print(f"{module:<16} {r['import_p50'] * 1e3:8.2f}ms {r['import_min'] * 1e3:8.2f}ms "
+              f"{r['total_p50'] * 1e3:8.2f}ms {r['new_modules']:8d}  {'，'.join(problems)}")
+        if problems:
+            failed.append(module)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: UTF-8 -*-
+# bench_population.py
+# Python 3.8.10
+#
+# 大规模人群引擎的扩展性跑分：玩家数量从 10 增加到 10^6 时，每轮耗时应基本不变。
+# 用法（在仓库根目录下运行）：python benchmarks/bench_population.py [--epochs 200] [--replicas 1]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch import BatchGame
+from population import PopulationGame, PopulationParameters
+
+PLAYER_COUNTS = (10, 100, 1000, 10000, 100000, 1000000)
+
+
+def bench(make_game, params, epochs):
+    """
+    运行 epochs 轮游戏，返回每轮耗时（秒）。
+
+    先不计时地运行一轮，得分查找表等一次性的开销不计入结果；计时时不显示进度条。
+
+    参数：
+    - make_game：由参数对象创建游戏的函数
+    - params：参数对象（不会被修改）
+    - epochs：计时的轮数
+    """
+    make_game(params.replace(NUM_EPOCHS=1)).main(progress=False)
+    game = make_game(params.replace(NUM_EPOCHS=epochs))
+    start = time.perf_counter()
+    game.main(progress=False)
+    return (time.perf_counter() - start) / epochs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="大规模人群引擎扩展性跑分")
+    parser.add_argument('--config', default='normal.ini', help="游戏配置文件")
+    parser.add_argument('--epochs', type=int, default=200, help="每种规模运行的轮数")
+    parser.add_argument('--replicas', type=int, default=1, help="同时进行的独立游戏局数")
+    parser.add_argument('--players-limit', type=int, default=10000, help="逐玩家模式对照组的最大玩家数量")
+    args = parser.parse_args()
+
+    print(f"{'玩家数量':>10} {'计数模式 ms/轮':>16} {'逐玩家模式 ms/轮':>18}")
+    for num_players in PLAYER_COUNTS:
+        params = PopulationParameters(args.config, num_players)
+        counts = bench(lambda p: PopulationGame(None, num_replicas=args.replicas, params=p), params, args.epochs)
+        if num_players <= args.players_limit:
+            players = bench(lambda p: BatchGame(None, args.replicas, mode='players', params=p), params, args.epochs)
+            players = f"{players * 1000:18.3f}"
+        else:
+            players = f"{'-':>18}"
+        print(f"{num_players:>10} {counts * 1000:16.3f} {players}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# -*- coding: UTF-8 -*-
+# checkpoint.py
+# Python 3.8.10
+#
+# 检查点文件的读写。
+# 检查点是一个 .npz 文件：状态字典中的数组分别保存为 .npy，其余的值（数字、字符串、列表、字典）
+# 合并为一个 JSON 字符串保存在 'meta' 中，读取时不需要 pickle。
+# 保存和恢复游戏状态的逻辑见 Game.save_checkpoint、Game.from_checkpoint。
+
+import json
+import os
+
+import numpy as np
+
+# 检查点格式版本，格式不兼容地改变时加一
+VERSION = 1
+
+
+def _split(state, prefix, arrays):
+    """把嵌套的状态字典拆成 JSON 部分和 {'a.b.c': 数组} 部分。"""
+    meta = {}
+    for key, value in state.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, np.ndarray):
+            arrays[name] = value
+        elif isinstance(value, dict):
+            meta[key] = _split(value, name + '.', arrays)
+        else:
+            meta[key] = value
+    return meta
+
+
+def _merge(meta, arrays):
+    """_split 的逆操作。"""
+    state = {}
+    for name, array in arrays.items():
+        *path, key = name.split('.')
+        node = state
+        for part in path:
+            node = node.setdefault(part, {})
+        node[key] = array
+
+    def merge(node, meta):
+        for key, value in meta.items():
+            if isinstance(value, dict):
+                merge(node.setdefault(key, {}), value)
+            else:
+                node[key] = value
+    merge(state, meta)
+    return state
+
+
+def _json_default(value):
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, (tuple, set)):
+        return list(value)
+    raise TypeError(f"无法保存到检查点的值：{value!r}")
+
+
+def write(path, state):
+    """
+    把状态字典写入检查点文件。先写入临时文件再替换，写入过程中中断不会损坏已有的检查点。
+
+    参数：
+    - path：检查点文件路径
+    - state：嵌套的状态字典，值为数组或可以保存为 JSON 的值
+    """
+    arrays = {}
+    meta = _split(state, '', arrays)
+    meta['version'] = VERSION
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        np.savez(f, meta=np.array(json.dumps(meta, default=_json_default)), **arrays)
+    os.replace(tmp, path)
+
+
+def read(path):
+    """
+    读取检查点文件，返回嵌套的状态字典。
+    """
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data['meta']))
+        arrays = {name: data[name] for name in data.files if name != 'meta'}
+    if meta.get('version') != VERSION:
+        raise ValueError(f"检查点 {path} 的格式版本 {meta.get('version')} 与当前版本 {VERSION} 不一致QAQ")
+    return _merge(meta, arrays)
+
+
+def rng_state(rngs):
+    """
+    随机数生成器的状态：rngs 为 None 时是 numpy 全局随机数生成器的状态，否则是每个 Generator 的状态。
+    """
+    if rngs is None:
+        name, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+        return {'legacy': {'name': name, 'keys': keys, 'pos': int(pos), 'has_gauss': int(has_gauss),
+                           'cached_gaussian': float(cached_gaussian)}}
+    return {'generators': [rng.bit_generator.state for rng in rngs]}
+
+
+def set_rng_state(rngs, state):
+    """恢复 rng_state 保存的状态。"""
+    if 'legacy' in state:
+        legacy = state['legacy']
+        np.random.set_state((legacy['name'], np.asarray(legacy['keys'], dtype=np.uint32), legacy['pos'],
+                             legacy['has_gauss'], legacy['cached_gaussian']))
+        return
+    if rngs is None or len(rngs) != len(state['generators']):
+        raise ValueError("检查点中的随机数流与当前游戏不一致QAQ")
+    for rng, generator_state in zip(rngs, state['generators']):
+        rng.bit_generator.state = generator_state
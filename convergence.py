@@ -0,0 +1,134 @@
+# -*- coding: UTF-8 -*-
+# convergence.py
+# Python 3.8.10
+#
+# 收敛检测：按固定窗口统计策略概率的漂移和平均得分的方差，概率不再变化时提前结束游戏。
+# 比较的是相邻两个窗口内的平均概率，因此不仅能识别不动点，也能识别周期短于窗口的稳定循环。
+
+import math
+
+import numpy as np
+
+# 配置文件 [Convergence] 节中可以给出的参数及其默认值
+DEFAULTS = {
+    'window': 1000,
+    'tolerance': 1e-3,
+    'score_tolerance': None,
+    'patience': 1,
+    'early_stop': True,
+}
+
+
+class ConvergenceMonitor:
+    def __init__(self, num_options, window=1000, tolerance=1e-3, score_tolerance=None, patience=1, early_stop=True):
+        """
+        收敛检测器，每轮由 Game.main 调用 update。
+
+        每满 window 轮计算一次：
+        - drift：本窗口与上一窗口的平均概率之差的最大绝对值
+        - score_var：本窗口内每轮平均得分的方差
+        连续 patience 个窗口满足 drift <= tolerance（给出 score_tolerance 时还要求 score_var <= score_tolerance）
+        即认为已经收敛。
+
+        参数：
+        - num_options：选项数量
+        - window：窗口长度（轮）
+        - tolerance：平均概率漂移的容差
+        - score_tolerance：可选，平均得分方差的容差
+        - patience：需要连续满足条件的窗口数
+        - early_stop：收敛后是否提前结束游戏；为假时只记录收敛的轮次
+
+        属性：
+        - converged_epoch：第一次满足收敛条件的轮次（从 0 开始），未收敛时为 None
+        - history：每个窗口的 (结束轮次, drift, 平均得分, score_var) 列表，第一个窗口的 drift 为 inf
+        """
+        if window < 1:
+            raise ValueError(f"收敛检测的窗口长度必须为正整数，{window} 是无效的QAQ")
+        if patience < 1:
+            raise ValueError(f"patience 必须为正整数，{patience} 是无效的QAQ")
+        self.window = window
+        self.tolerance = tolerance
+        self.score_tolerance = score_tolerance
+        self.patience = patience
+        self.early_stop = early_stop
+
+        self._pList = np.empty((window, num_options), dtype=np.float64)  # 当前窗口每轮的概率
+        self._score = np.empty(window, dtype=np.float64)  # 当前窗口每轮的平均得分
+        self._k = 0  # 当前窗口已记录的轮数
+        self._last_mean = None  # 上一窗口的平均概率
+        self._streak = 0  # 连续满足条件的窗口数
+        self.converged_epoch = None
+        self.history = []
+
+    @classmethod
+    def from_params(cls, params):
+        """按参数对象中的收敛检测配置（params.convergence）创建检测器，未配置时返回 None。"""
+        if getattr(params, 'convergence', None) is None:
+            return None
+        return cls(params.NUM_OPTIONS, **params.convergence)
+
+    def update(self, i, pList, avg_score):
+        """
+        记录第 i 轮结束时的概率和本轮的平均得分。
+
+        返回：
+        - 是否应当结束游戏（已收敛且 early_stop 为真）
+        """
+        self._pList[self._k] = pList
+        self._score[self._k] = avg_score
+        self._k += 1
+        if self._k == self.window:
+            self._check(i)
+        return self.early_stop and self.converged_epoch is not None
+
+    def _check(self, i):
+        """窗口已满，计算统计量并更新收敛状态。"""
+        self._k = 0
+        mean = self._pList.mean(axis=0)
+        drift = math.inf if self._last_mean is None else float(np.abs(mean - self._last_mean).max())
+        self._last_mean = mean
+        score_var = float(self._score.var())
+        self.history.append((i, drift, float(self._score.mean()), score_var))
+
+        settled = drift <= self.tolerance and (self.score_tolerance is None or score_var <= self.score_tolerance)
+        self._streak = self._streak + 1 if settled else 0
+        if self._streak >= self.patience and self.converged_epoch is None:
+            self.converged_epoch = i
+
+    def state(self):
+        """检查点用的状态字典。"""
+        return {
+            'config': {'window': self.window, 'tolerance': self.tolerance, 'score_tolerance': self.score_tolerance,
+                       'patience': self.patience, 'early_stop': self.early_stop},
+            'pList': self._pList.copy(), 'score': self._score.copy(), 'k': self._k,
+            'last_mean': None if self._last_mean is None else self._last_mean.copy(),
+            'streak': self._streak, 'converged_epoch': self.converged_epoch,
+            'history': [list(h) for h in self.history],
+        }
+
+    @classmethod
+    def restore(cls, state):
+        """按 state() 保存的状态重建检测器。"""
+        monitor = cls(state['pList'].shape[1], **state['config'])
+        monitor._pList[:] = state['pList']
+        monitor._score[:] = state['score']
+        monitor._k = state['k']
+        monitor._last_mean = state['last_mean']
+        monitor._streak = state['streak']
+        monitor.converged_epoch = state['converged_epoch']
+        monitor.history = [tuple(h) for h in state['history']]
+        return monitor
+
+    @property
+    def converged(self):
+        return self.converged_epoch is not None
+
+    @property
+    def drift(self):
+        """最近一个窗口的概率漂移，还没有完整窗口时为 None。"""
+        return self.history[-1][1] if self.history else None
+
+    @property
+    def score_var(self):
+        """最近一个窗口的平均得分方差，还没有完整窗口时为 None。"""
+        return self.history[-1][3] if self.history else None
@@ -0,0 +1,50 @@
+# -*- coding: UTF-8 -*-
+# display.py
+# Python 3.8.10
+#
+# 进度条和绘图的延迟加载。
+# tqdm 和 matplotlib 只在真正需要显示进度条或画图时才导入，
+# 作为库使用（例如扫描的工作进程）时 import Game 不会加载它们，也不会修改它们的全局设置。
+
+# 中文字体，缺少 SimHei 时退回 matplotlib 自带的字体
+FONTS = ['SimHei', 'DejaVu Sans']
+
+_plt = None
+
+
+def trange(*args, progress=True):
+    """
+    返回 range(*args)；progress 为真时返回带进度条的 tqdm.trange(*args)。
+    """
+    if not progress:
+        return range(*args)
+    import tqdm
+    return tqdm.trange(*args)
+
+
+def pyplot():
+    """
+    第一次调用时导入 matplotlib.pyplot 并设置中文字体，返回 pyplot 模块。
+    """
+    global _plt
+    if _plt is None:
+        import matplotlib.pyplot as plt
+        plt.rcParams['font.sans-serif'] = FONTS
+        _plt = plt
+    return _plt
+
+
+def figure(**kwargs):
+    """
+    返回使用 Agg 画布的 matplotlib Figure，不导入 pyplot、不需要图形界面，可以直接保存为 PNG、SVG 等文件。
+
+    参数：
+    - kwargs：传给 matplotlib.figure.Figure，例如 figsize、dpi
+    """
+    import matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    matplotlib.rcParams['font.sans-serif'] = FONTS
+    fig = Figure(**kwargs)
+    FigureCanvasAgg(fig)
+    return fig
@@ -0,0 +1,199 @@
+# -*- coding: UTF-8 -*-
+# estimator.py
+# Python 3.8.10
+#
+# 自适应蒙特卡洛估计：分批运行同一配置的多局独立游戏（batch.BatchGame），
+# 给出最终概率和平均得分的均值及置信区间，置信区间的半宽达到要求时停止。
+# 比较两组配置时可以使用公共随机数：两组的第 k 批使用同一个子流，差值的方差通常远小于两者方差之和。
+# 用法（在仓库根目录下运行）：
+#   python estimator.py --half-width 0.005
+#   python estimator.py --b LEARN_RATE_UP=1.01 --half-width 0.005
+
+import argparse
+import math
+import statistics
+
+import numpy as np
+
+import seeding
+from Game import Parameters
+from batch import BatchGame
+
+
+def summarize(values, confidence=0.95):
+    """
+    按正态近似计算均值的置信区间。
+
+    参数：
+    - values：(n,) 或 (n, k) 数组，每行为一局的结果
+    - confidence：置信水平
+
+    返回：
+    - {'n', 'mean', 'std', 'half_width', 'low', 'high'}，后五项的形状与 values 的一行相同
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    mean = values.mean(axis=0)
+    std = values.std(axis=0, ddof=1) if n > 1 else np.full_like(mean, np.inf)
+    half_width = statistics.NormalDist().inv_cdf(0.5 + confidence / 2) * std / math.sqrt(n)
+    return {'n': n, 'mean': mean, 'std': std, 'half_width': half_width, 'low': mean - half_width, 'high': mean + half_width}
+
+
+def run_batch(params, num_replicas, seed, mode='players'):
+    """
+    运行一批 num_replicas 局游戏。
+
+    参数：
+    - params：参数对象（不会被修改）
+    - num_replicas：这一批的局数
+    - seed：这一批的随机种子（np.random.SeedSequence）
+    - mode：BatchGame 的抽样模式
+
+    返回：
+    - (最终概率 (R, NUM_OPTIONS)，每局的平均得分 (R,))；平均得分与 Game.py 输出的“均分”相同，为记录的平均得分的均值
+    """
+    game = BatchGame(None, num_replicas, mode=mode, params=params, seed=seed)
+    game.main(progress=False)
+    with game.recorder:  # 取出结果之后删除可能的临时目录
+        return np.array(game.params.pList), np.asarray(game.avg_score).mean(axis=0)
+
+
+def _reached(stats, half_width, pList_half_width):
+    """得分（以及可选的概率）的置信区间半宽是否都已达到要求。"""
+    if stats['score']['half_width'] > half_width:
+        return False
+    return pList_half_width is None or stats['pList']['half_width'].max() <= pList_half_width
+
+
+def estimate(config_file=None, params=None, half_width=0.01, pList_half_width=None, confidence=0.95,
+             batch_size=64, min_batches=2, max_replicas=4096, seed=None, mode='players'):
+    """
+    分批运行独立的游戏，直到平均得分的置信区间半宽不超过 half_width（或达到 max_replicas 局）。
+
+    参数：
+    - config_file：配置文件路径，给出 params 时可为 None
+    - params：可选，已加载的参数对象
+    - half_width：平均得分置信区间半宽的目标
+    - pList_half_width：可选，最终概率各分量置信区间半宽的目标
+    - confidence：置信水平
+    - batch_size：每批的局数，一批在 BatchGame 中向量化运行
+    - min_batches：至少运行的批数，避免由前几局偶然偏小的方差提前停止
+    - max_replicas：最多运行的局数，不是 batch_size 的整数倍时最后一批只运行剩余的局数
+    - seed：根随机种子，默认为配置中的 SEED（见 seeding.resolve_root_seed）；第 k 批使用其第 k 个子流
+    - mode：BatchGame 的抽样模式
+
+    返回：
+    - {'score': summarize(每局平均得分), 'pList': summarize(每局最终概率), 'replicas', 'batches', 'reached'}，
+      reached 表示是否在 max_replicas 局内达到了要求的半宽
+    """
+    params = Parameters(config_file) if params is None else params
+    root = seeding.seed_sequence(seeding.resolve_root_seed(seed, params))
+
+    pLists, scores = [], []
+    batches = replicas = 0
+    while True:
+        size = min(batch_size, max_replicas - replicas)
+        pList, score = run_batch(params, size, seeding.child(root, batches), mode)
+        pLists.append(pList)
+        scores.append(score)
+        batches += 1
+        replicas += size
+        stats = {'score': summarize(np.concatenate(scores), confidence),
+                 'pList': summarize(np.concatenate(pLists), confidence)}
+        reached = _reached(stats, half_width, pList_half_width)
+        if (reached and batches >= min_batches) or replicas >= max_replicas:
+            break
+    stats.update(replicas=replicas, batches=batches, reached=reached)
+    return stats
+
+
+def compare(params_a, params_b, half_width=0.01, confidence=0.95, batch_size=64, min_batches=2,
+            max_replicas=4096, seed=None, mode='players', common_random_numbers=True):
+    """
+    比较两组配置的平均得分，直到差值（A - B）的置信区间半宽不超过 half_width。
+
+    使用公共随机数时，两组的第 k 批使用同一个子流，第 r 局与第 r 局配对：逐玩家模式下每轮消耗的随机数个数
+    与概率无关，两组的随机数逐轮对齐，差值的方差通常远小于两者方差之和，达到同样精度所需的局数更少。
+
+    参数：
+    - params_a、params_b：两组参数对象，玩家数量和选项数量必须相同
+    - common_random_numbers：是否使用公共随机数；为假时两组使用互相独立的子流
+    - 其余参数同 estimate
+
+    返回：
+    - {'difference': summarize(配对差值), 'a': summarize(A 的得分), 'b': summarize(B 的得分),
+       'pList_a', 'pList_b'（最终概率的 summarize），'variance_ratio', 'replicas', 'batches', 'reached'}；
+      variance_ratio 为配对差值的方差与两组方差之和的比值，小于 1 说明公共随机数减小了方差
+    """
+    root = seeding.seed_sequence(seeding.resolve_root_seed(seed, params_a))
+
+    results = {'a': ([], []), 'b': ([], [])}
+    batches = replicas = 0
+    while True:
+        size = min(batch_size, max_replicas - replicas)
+        for t, (arm, params) in enumerate((('a', params_a), ('b', params_b))):
+            # 公共随机数：两组都用第 k 批的子流；否则各用其下的第 t 个子流
+            seq = seeding.child(root, batches) if common_random_numbers else seeding.child(root, batches, t)
+            pList, score = run_batch(params, size, seq, mode)
+            results[arm][0].append(pList)
+            results[arm][1].append(score)
+        batches += 1
+        replicas += size
+        score_a, score_b = np.concatenate(results['a'][1]), np.concatenate(results['b'][1])
+        difference = summarize(score_a - score_b, confidence)
+        reached = difference['half_width'] <= half_width
+        if (reached and batches >= min_batches) or replicas >= max_replicas:
+            break
+
+    a, b = summarize(score_a, confidence), summarize(score_b, confidence)
+    total_var = a['std'] ** 2 + b['std'] ** 2
+    return {
+        'difference': difference, 'a': a, 'b': b,
+        'pList_a': summarize(np.concatenate(results['a'][0]), confidence),
+        'pList_b': summarize(np.concatenate(results['b'][0]), confidence),
+        'variance_ratio': float(difference['std'] ** 2 / total_var) if total_var > 0 else math.nan,
+        'replicas': replicas, 'batches': batches, 'reached': reached,
+    }
+
+
+def _format(stats):
+    return f"{stats['mean']:.4f} ± {stats['half_width']:.4f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="平均得分和最终概率的自适应蒙特卡洛估计")
+    parser.add_argument('--config', default='normal.ini', help="游戏配置文件")
+    parser.add_argument('--half-width', type=float, default=0.01, help="平均得分（或差值）置信区间半宽的目标")
+    parser.add_argument('--confidence', type=float, default=0.95, help="置信水平")
+    parser.add_argument('--batch', type=int, default=64, help="每批的局数")
+    parser.add_argument('--max-replicas', type=int, default=4096, help="最多运行的局数")
+    parser.add_argument('--mode', default='players', choices=('players', 'counts'), help="BatchGame 的抽样模式")
+    parser.add_argument('--seed', type=int, default=None, help="根随机种子，默认为配置中的 SEED")
+    parser.add_argument('--b', action='append', metavar='NAME=VALUE',
+                        help="与配置比较的 B 组参数覆盖，例如 LEARN_RATE_UP=1.01；pList 的分量用逗号分隔")
+    parser.add_argument('--independent', action='store_true', help="比较时不使用公共随机数")
+    args = parser.parse_args()
+
+    params = Parameters(args.config)
+    options = dict(half_width=args.half_width, confidence=args.confidence, batch_size=args.batch,
+                   max_replicas=args.max_replicas, seed=args.seed, mode=args.mode)
+    if not args.b:
+        stats = estimate(params=params, **options)
+        print(f"{stats['replicas']} 局（{stats['batches']} 批），{'已' if stats['reached'] else '未'}达到要求的半宽")
+        print("均分", _format(stats['score']))
+        print("概率", np.round(stats['pList']['mean'], 4).tolist(), "±", np.round(stats['pList']['half_width'], 4).tolist())
+        return
+
+    overrides = {}
+    for item in args.b:
+        name, _, value = item.partition('=')
+        overrides[name.strip()] = [float(x) for x in value.split(',')] if name.strip() == 'pList' else float(value)
+    result = compare(params, params.replace(**overrides), common_random_numbers=not args.independent, **options)
+    print(f"{result['replicas']} 局（{result['batches']} 批），{'已' if result['reached'] else '未'}达到要求的半宽")
+    print("A 均分", _format(result['a']))
+    print("B 均分", _format(result['b']), overrides)
+    print("A - B", _format(result['difference']), f"方差比 {result['variance_ratio']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# -*- coding: UTF-8 -*-
+# exact.py
+# Python 3.8.10
+
+import copy
+import math
+
+import numpy as np
+
+from Game import Parameters
+from payoff import compositions, option_payoffs, option_totals
+from strategies import normal
+
+
+class ExactGame:
+    def __init__(self, config_file, params=None):
+        """
+        初始化精确期望模型：对所有人数组合按多项分布精确求期望，代替蒙特卡洛抽样。
+
+        初始化时针对当前 [Q1] 得分参数预先计算一次“人数组合 → 每个选项得分”表，
+        之后对任意 pList 求期望只需一次矩阵-向量乘法。
+
+        参数：
+        - config_file：配置文件路径
+        - params：可选，已加载的参数对象；给出时不再读取 config_file
+
+        属性：
+        - params：策略参数对象
+        - ans_list：所有人数组合，(C, NUM_OPTIONS) 数组
+        - option_payoff：每个组合下每个选项的单人得分，(C, NUM_OPTIONS) 数组
+        - option_scores：每个组合下每个选项的总得分，(C, NUM_OPTIONS) 数组，与逐玩家模式一样逐次累加（见 payoff.option_totals）
+        - best_weights：每个组合下“第一个得分最高的玩家”落在各选项上的概率，(C, NUM_OPTIONS) 数组
+        """
+        self.params = Parameters(config_file) if params is None else params
+        P = self.params.NUM_PLAYERS
+
+        self.ans_list = compositions(P, self.params.NUM_OPTIONS)
+        self.option_payoff = option_payoffs(self.ans_list, self.params)
+        self.option_scores = option_totals(self.ans_list, self.option_payoff)
+
+        # 得分最高的玩家在各个得分最高的选项上的概率与该选项人数成正比
+        chosen = self.ans_list > 0
+        top = np.where(chosen, self.option_payoff, -np.inf).max(axis=1, keepdims=True)
+        weights = np.where(chosen & (self.option_payoff == top), self.ans_list, 0)
+        self.best_weights = weights / weights.sum(axis=1, keepdims=True)
+
+        # 多项式系数的对数 log(P! / prod(c_i!))
+        log_factorial = np.array([math.lgamma(n + 1) for n in range(P + 1)])
+        self._log_coef = log_factorial[P] - log_factorial[self.ans_list].sum(axis=1)
+
+    def probabilities(self, pList):
+        """
+        返回在概率 pList 下每个人数组合出现的精确概率，形状为 (C,)。
+        """
+        pList = np.asarray(pList, dtype=np.float64)
+        pList = pList / pList.sum()
+        log_p = np.log(np.where(pList > 0, pList, 1))
+        prob = np.exp(self._log_coef + self.ans_list @ log_p)
+        impossible = (self.ans_list[:, pList <= 0] > 0).any(axis=1)  # 选了概率为 0 的选项
+        prob[impossible] = 0
+        return prob
+
+    def expected_scores(self, pList):
+        """
+        返回在概率 pList 下每个选项本轮总得分的精确期望，形状为 (NUM_OPTIONS,)。
+        """
+        return self.probabilities(pList) @ self.option_scores
+
+    def expected_avg_score(self, pList):
+        """
+        返回在概率 pList 下本轮平均得分的精确期望。
+        """
+        return self.expected_scores(pList).sum() / self.params.NUM_PLAYERS
+
+    def expected_adjust(self, pList, iter=0):
+        """
+        返回 norm_scheme_adjust 在概率 pList、第 iter 轮之后的 pList 的精确期望。
+
+        对每个人数组合及其可能的“得分最高玩家的选项”分别调用一次批量策略（仅计数模式），
+        再按组合概率加权求和。
+        """
+        pList = np.asarray(pList, dtype=np.float64)
+        prob = self.probabilities(pList)[:, None] * self.best_weights
+        combo, best_option = np.nonzero(prob)
+
+        params = copy.copy(self.params)
+        params.iter = iter
+        params.ans_list = self.ans_list[combo]
+        params.option_payoff = self.option_payoff[combo]
+        params.option_scores = self.option_scores[combo]
+        params.best_option = best_option
+        params.crowds_ans = None
+        params.score_list = None
+        params.pList = np.tile(pList, (len(combo), 1))
+        adjusted = normal.norm_scheme_adjust_batch(params, 1)
+        return prob[combo, best_option] @ adjusted
@@ -0,0 +1,120 @@
+# -*- coding: UTF-8 -*-
+# instrument.py
+# Python 3.8.10
+
+import time
+import tracemalloc
+
+import numpy as np
+
+# Game.main 每轮的各个阶段
+PHASES = ('sampling', 'scoring', 'recording', 'adjust')
+
+
+class Instrument:
+    def __init__(self, num_epochs, memory=True):
+        """
+        Game.main 的主循环计时器，记录每轮各阶段（抽样、计分、记录、策略调整）的耗时
+        以及每轮新分配的内存（tracemalloc）。
+
+        时间戳和内存统计写入预分配的数组，主循环中计时器本身不分配 Python 对象，不会计入内存统计。
+        统计内存时每轮开始会清空 tracemalloc 的记录；tracemalloc 会拖慢分配较多的阶段，只看耗时时可以关闭。
+
+        参数：
+        - num_epochs：最多记录的轮数
+        - memory：是否统计内存
+
+        属性：
+        - epochs：已记录的轮数
+        - times：每轮各阶段耗时（秒），(epochs, len(PHASES)) 数组
+        - net_bytes：本轮新分配、到本轮结束仍未释放的内存（字节），(epochs,) 数组
+        - peak_bytes：本轮新分配的内存同时存在的峰值（字节），包括轮内分配后又释放的临时对象，(epochs,) 数组
+        """
+        self.memory = memory
+        self.epochs = 0
+        self._stamps = np.zeros((num_epochs, len(PHASES) + 1), dtype=np.float64)  # 每轮各阶段之间的时间戳
+        self._traced = np.zeros((num_epochs, 2), dtype=np.int64)  # 每轮的 (净值, 峰值)
+        self._started = False
+
+    def start(self):
+        """开始统计：需要统计内存且 tracemalloc 还没有启动时启动它。"""
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+
+    def stop(self):
+        """结束统计：停止由 start() 启动的 tracemalloc。"""
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def begin(self):
+        """
+        开始一轮：返回本轮的时间戳行（预分配数组的一行，依次写入各阶段开始和结束时的 clock()），
+        并清空 tracemalloc 的记录，此后的分配都计入本轮。
+        """
+        stamps = self._stamps[self.epochs]
+        if self.memory:
+            tracemalloc.clear_traces()
+        return stamps
+
+    def end(self):
+        """结束一轮：记录本轮新分配内存的净值和峰值。"""
+        if self.memory:
+            self._traced[self.epochs] = tracemalloc.get_traced_memory()
+        self.epochs += 1
+
+    @property
+    def times(self):
+        return np.diff(self._stamps[:self.epochs], axis=1)
+
+    @property
+    def net_bytes(self):
+        return self._traced[:self.epochs, 0]
+
+    @property
+    def peak_bytes(self):
+        return self._traced[:self.epochs, 1]
+
+    def summary(self):
+        """
+        返回各阶段的统计：{阶段: {'total', 'mean', 'p50', 'p99', 'share'}}，'epoch'（整轮），
+        统计内存时还有 'memory'（每轮新分配内存净值和峰值的平均值和最大值，字节）。
+        """
+        times = self.times
+        if not self.epochs:
+            return {}
+        total = times.sum()
+        result = {}
+        for k, name in enumerate(PHASES + ('epoch',)):
+            column = times[:, k] if k < len(PHASES) else times.sum(axis=1)
+            result[name] = {
+                'total': float(column.sum()),
+                'mean': float(column.mean()),
+                'p50': float(np.percentile(column, 50)),
+                'p99': float(np.percentile(column, 99)),
+                'share': float(column.sum() / total) if total else 0.0,
+            }
+        if self.memory:
+            result['memory'] = {'net_mean': float(self.net_bytes.mean()), 'net_max': int(self.net_bytes.max()),
+                                'peak_mean': float(self.peak_bytes.mean()), 'peak_max': int(self.peak_bytes.max())}
+        return result
+
+    def report(self):
+        """返回可读的统计表。"""
+        summary = self.summary()
+        if not summary:
+            return "没有记录"
+        lines = [f"{'阶段':<12} {'总耗时 s':>10} {'平均 us':>10} {'p50 us':>10} {'p99 us':>10} {'占比':>8}"]
+        for name in PHASES + ('epoch',):
+            s = summary[name]
+            lines.append(f"{name:<12} {s['total']:10.4f} {s['mean'] * 1e6:10.2f} {s['p50'] * 1e6:10.2f} {s['p99'] * 1e6:10.2f} {s['share']:8.1%}")
+        lines.append(f"共 {self.epochs} 轮")
+        if self.memory:
+            m = summary['memory']
+            lines.append(f"每轮新分配内存 净值 平均 {m['net_mean']:.1f} B 最大 {m['net_max']} B，"
+                         f"峰值 平均 {m['peak_mean']:.1f} B 最大 {m['peak_max']} B")
+        return "\n".join(lines)
+
+
+clock = time.perf_counter
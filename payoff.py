@@ -0,0 +1,173 @@
+# -*- coding: UTF-8 -*-
+# payoff.py
+# Python 3.8.10
+
+import itertools
+
+import numpy as np
+
+# 第一题中可用的选项规则，默认的五个选项依次使用这五种规则
+OPTION_KINDS = ('cautious', 'fairness', 'solidarity', 'wisdom', 'bravery')
+
+# 得分查找表的最大编码空间，超过时退回逐次计算
+TABLE_LIMIT = 1 << 22
+
+# 当前 [Q1] 得分配置对应的查找表，配置变化时整体替换
+_table_cache = {}
+
+
+def parse_options(text):
+    """
+    解析 [Q1] 中的 options 配置。
+
+    每一项为“名称”或“名称:规则”，省略规则时名称即规则，例如
+    “cautious, fairness, solidarity, wisdom, bravery, safe:cautious”。
+
+    返回：
+    - [(名称, 规则), ...] 列表
+    """
+    options = []
+    for item in text.split(','):
+        name, _, kind = item.strip().partition(':')
+        name = name.strip()
+        kind = kind.strip() or name
+        if kind not in OPTION_KINDS:
+            raise ValueError(f"未知的选项规则 {kind}，可选 {OPTION_KINDS}")
+        options.append((name, kind))
+    if len(set(name for name, _ in options)) != len(options):
+        raise ValueError(f"选项名称重复: {text}")
+    return options
+
+
+def option_payoffs(ans_list, params):
+    """
+    根据每个选项的人数计算本轮每个选项的单人得分（向量化版本的 Game.calc_scores）。
+
+    参数：
+    - ans_list：形状为 (..., NUM_OPTIONS) 的人数数组，最后一维为每个选项选择的玩家数量
+    - params：Parameters 对象，提供选项集合 options 和每个选项的得分 <名称>_score
+
+    返回：
+    - 形状与 ans_list 相同的 float64 数组，表示选择该选项的每个玩家本轮所得分数
+    """
+    ans_list = np.asarray(ans_list)
+    most = ans_list.max(axis=-1)
+    least = ans_list.min(axis=-1)
+
+    payoff = np.empty(ans_list.shape, dtype=np.float64)
+    for option, (name, kind) in enumerate(params.options):
+        score = getattr(params, f'{name}_score')
+        count = ans_list[..., option]
+        if kind == 'cautious':  # 谨慎
+            payoff[..., option] = score
+        elif kind == 'fairness':  # 公平
+            payoff[..., option] = np.where(count != 0, score / np.maximum(count, 1), 0)
+        elif kind == 'solidarity':  # 团结
+            payoff[..., option] = np.where(count >= most, score, 0)
+        elif kind == 'wisdom':  # 智慧
+            payoff[..., option] = np.where(count <= least, score, 0)
+        elif kind == 'bravery':  # 勇气
+            payoff[..., option] = np.where(count == 1, score, 0)
+    return payoff
+
+
+def option_totals(ans_list, payoff):
+    """
+    每个选项本轮的总得分，与逐玩家模式的求和方式相同：把单人得分从 0 开始逐次累加“人数”次，
+    而不是直接计算 人数 * 单人得分。二者在浮点下不一定相等，例如 3/7 累加 7 次为 2.9999999999999996，
+    而 7 * (3/7) 为 3.0，会影响“总得分最高的选项”是否并列。
+
+    参数：
+    - ans_list：形状为 (..., NUM_OPTIONS) 的人数数组
+    - payoff：形状相同的单人得分数组（见 option_payoffs）
+
+    返回：
+    - 形状相同的 float64 数组；循环次数为最大人数，玩家较多时请用查找表（见 lookup_totals）
+    """
+    ans_list = np.asarray(ans_list)
+    totals = np.zeros(ans_list.shape, dtype=np.float64)
+    for k in range(1, int(ans_list.max(initial=0)) + 1):
+        totals += np.where(ans_list >= k, payoff, 0)  # 加 0 不改变累加值
+    return totals
+
+
+def compositions(num_players, num_options):
+    """
+    列出 num_players 名玩家在 num_options 个选项上的所有人数组合（隔板法）。
+
+    返回：
+    - 形状为 (C, num_options) 的 int64 数组，C = comb(num_players + num_options - 1, num_options - 1)，
+      按字典序倒序排列（第一行为所有人都选第一个选项）
+    """
+    slots = num_players + num_options - 1
+    bars = np.array(list(itertools.combinations(range(slots), num_options - 1)), dtype=np.int64).reshape(-1, num_options - 1)
+    edges = np.hstack([np.full((len(bars), 1), -1), bars, np.full((len(bars), 1), slots)])
+    return np.diff(edges, axis=1) - 1
+
+
+def _table_key(params):
+    return (params.NUM_PLAYERS, tuple(params.options),
+            tuple(getattr(params, f'{name}_score') for name, _ in params.options))
+
+
+def payoff_table(params):
+    """
+    返回当前 [Q1] 得分配置下的得分查找表，首次调用时构建并缓存，配置变化时淘汰旧表。
+
+    人数组合 (c_0, ..., c_{k-1}) 按 NUM_PLAYERS + 1 进制编码为整数 code = sum(c_i * radix^i)，
+    rank[code] 为该组合在 table 中的行号。
+
+    返回：
+    - weights：编码用的各位权重，(NUM_OPTIONS,) 数组
+    - rank：编码 → 行号，(radix^NUM_OPTIONS,) 数组，无效编码为 -1
+    - table：每个组合下每个选项的单人得分，(C, NUM_OPTIONS) 数组
+    - rows：编码 → 该组合每个选项单人得分的元组，供单局游戏逐次查找（避免小数组上的 numpy 开销）
+    - totals：每个组合下每个选项的总得分，(C, NUM_OPTIONS) 数组（见 option_totals）
+    若编码空间超过 TABLE_LIMIT 则返回 None
+    """
+    key = _table_key(params)
+    cached = _table_cache.get(key)
+    if cached is None:
+        radix = params.NUM_PLAYERS + 1
+        num_options = len(params.options)
+        if radix ** num_options > TABLE_LIMIT:
+            return None
+        _table_cache.clear()
+
+        ans_list = compositions(params.NUM_PLAYERS, num_options)
+        weights = radix ** np.arange(num_options, dtype=np.int64)
+        rank = np.full(radix ** num_options, -1, dtype=np.int32)
+        rank[ans_list @ weights] = np.arange(len(ans_list), dtype=np.int32)
+        table = option_payoffs(ans_list, params)
+        rows = dict(zip((ans_list @ weights).tolist(), map(tuple, table.tolist())))
+        totals = option_totals(ans_list, table)
+        cached = _table_cache[key] = (weights, rank, table, rows, totals)
+    return cached
+
+
+def lookup_payoffs(ans_list, params):
+    """
+    与 option_payoffs 相同，但通过查找表直接取出结果；编码空间过大时退回 option_payoffs。
+    """
+    cached = payoff_table(params)
+    if cached is None:
+        return option_payoffs(ans_list, params)
+    weights, rank, table = cached[:3]
+    return table[rank[np.asarray(ans_list) @ weights]]
+
+
+def lookup_totals(ans_list, params, payoff):
+    """
+    每个选项的总得分：有查找表时取出与逐玩家模式逐位相同的结果（见 option_totals）；
+    编码空间过大（大规模人群）时退回 ans_list * payoff，与逐玩家模式只在最后一位舍入上可能不同。
+
+    参数：
+    - ans_list：形状为 (..., NUM_OPTIONS) 的人数数组
+    - params：Parameters 对象
+    - payoff：ans_list 对应的单人得分数组（见 lookup_payoffs）
+    """
+    cached = payoff_table(params)
+    if cached is None:
+        return np.asarray(ans_list) * payoff
+    weights, rank, _, _, totals = cached
+    return totals[rank[np.asarray(ans_list) @ weights]]
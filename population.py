@@ -0,0 +1,83 @@
+# -*- coding: UTF-8 -*-
+# population.py
+# Python 3.8.10
+
+import time
+
+from Game import Parameters
+from batch import BatchGame
+
+
+class PopulationParameters(Parameters):
+    """
+    大规模人群的游戏参数，放宽了 Parameters 对玩家数量（10）和选项数量（5）的限制。
+
+    参数：
+        config_file (str)：配置文件的路径。
+        num_players (int)：可选，覆盖配置文件中的 NUM_PLAYERS。
+
+    选项集合由 questions/q1/default.ini 中 [Q1] 的 options 给出，NUM_OPTIONS 必须与之一致。
+    不保存逐玩家的 crowds_ans 和 score_list，内存只与选项数量有关。
+    """
+    _valid_players = staticmethod(lambda x: x > 0)
+    _valid_options = staticmethod(lambda x: x > 0)
+
+    def __init__(self, config_file, num_players=None):
+        super().__init__(config_file)
+        if num_players is not None:
+            if not self._valid_players(num_players):
+                raise ValueError(f"玩家数量必须为正整数，{num_players} 是无效的QAQ")
+            self.NUM_PLAYERS = int(num_players)
+            # 覆盖玩家数量时，其余类型人数不变，差额全部记为“常人”
+            others = sum(count for name, count in self.player_types.items() if name != 'normal')
+            if others > self.NUM_PLAYERS:
+                raise ValueError(f"玩家数量 {num_players} 少于其他类型的玩家数量 {others}QAQ")
+            self.player_types = dict(self.player_types, normal=self.NUM_PLAYERS - others)
+        self.crowds_ans = None
+        self.score_list = None
+
+    def _time_per_epoch(self):
+        """实测的每轮耗时（秒），按仅计数模式跑分（见 benchmark_brief）。"""
+        return benchmark_brief(iter=1000, params=self)
+
+    def _get_and_validate(self, config, section, option, type_func, validation_func=None):
+        if option in ('NUM_PLAYERS', 'NUM_OPTIONS'):
+            value = super()._get_and_validate(config, section, option, type_func)
+            if validation_func and not validation_func(value):
+                raise ValueError(f"{section} 中 {option} 必须为正整数，{value} 是无效的QAQ")
+            return value
+        return super()._get_and_validate(config, section, option, type_func, validation_func)
+
+
+class PopulationGame(BatchGame):
+    def __init__(self, config_file, num_players=None, num_replicas=1, seed=None, params=None, **record):
+        """
+        初始化大规模人群游戏对象。
+
+        以仅计数模式运行 BatchGame，支持任意玩家数量和 [Q1] 中定义的任意选项集合，
+        每轮的时间和内存只与选项数量（和局数）有关，与玩家数量无关。
+
+        参数：
+        - config_file：配置文件路径
+        - num_players：可选，覆盖配置文件中的 NUM_PLAYERS
+        - num_replicas：同时进行的独立游戏局数
+        - seed：可选，随机种子（int 或 np.random.SeedSequence），默认为配置中的 SEED
+        - params：可选，已加载的 PopulationParameters；给出时不再读取 config_file，也忽略 num_players
+        - record：轨迹记录参数 record_stride、record_path，见 BatchGame
+        """
+        params = PopulationParameters(config_file, num_players) if params is None else params
+        super().__init__(config_file, num_replicas, mode='counts', params=params, seed=seed, **record)
+
+
+def benchmark_brief(iter, params):
+    """
+    大规模人群引擎的性能跑分：以仅计数模式实际运行 iter 轮单局游戏，返回每轮耗时（秒）。
+
+    参数：
+    - iter：跑分的轮数
+    - params：跑分使用的参数对象（会被复制，不会被修改）
+    """
+    game = BatchGame(None, 1, mode='counts', params=params.replace(NUM_EPOCHS=iter), seed=0)
+    start = time.perf_counter()
+    game.main(progress=False)
+    return (time.perf_counter() - start) / iter
@@ -0,0 +1,172 @@
+# -*- coding: UTF-8 -*-
+# recorder.py
+# Python 3.8.10
+
+import os
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+
+# 轨迹超过这个大小（字节）时改为写入内存映射文件
+MAX_MEMORY = 256 * 2 ** 20
+
+
+def default_stride(num_epochs):
+    """
+    与原来的记录方式相同：不超过 100 轮时每轮记录，否则每 NUM_EPOCHS // 100 + 1 轮记录一次。
+    """
+    return 1 if num_epochs <= 100 else num_epochs // 100 + 1
+
+
+class TrajectoryRecorder:
+    def __init__(self, num_epochs, num_options, stride=None, shape=(), path=None, max_memory=MAX_MEMORY):
+        """
+        预分配的轨迹记录器，按固定间隔记录每个选项的概率和平均得分。
+
+        参数：
+        - num_epochs：游戏循环次数
+        - num_options：选项数量
+        - stride：记录间隔，第 i 轮（从 0 开始）在 (i+1) % stride == 0 时记录；
+          默认与原来相同（见 default_stride），为 1 时记录每一轮
+        - shape：每次记录的额外维度，例如批量游戏的 (R,)
+        - path：可选，目录路径；给出时轨迹写入该目录下的 pOption.npy 和 avg_score.npy（内存映射）
+        - max_memory：轨迹超过这个字节数且没有给出 path 时，写入临时目录下的内存映射文件；
+          临时目录在 close()、退出 with 语句或记录器被回收时删除
+
+        属性：
+        - stride：记录间隔
+        - path：内存映射文件所在目录，保存在内存中时为 None
+        - show：已记录的次数
+        - temporary：path 是否为自动创建的临时目录
+        """
+        self.stride = default_stride(num_epochs) if stride is None else stride
+        if self.stride < 1:
+            raise ValueError(f"记录间隔必须为正整数，{self.stride} 是无效的QAQ")
+        num_samples = num_epochs // self.stride
+        shape = tuple(shape)
+
+        p_shape = (num_samples,) + shape + (num_options,)
+        s_shape = (num_samples,) + shape
+        self.temporary = path is None and 8 * (np.prod(p_shape) + np.prod(s_shape)) > max_memory
+        if self.temporary:
+            path = tempfile.mkdtemp(prefix='trajectory_')
+            self._cleanup = weakref.finalize(self, shutil.rmtree, path, ignore_errors=True)
+        self.path = path
+        if path is None:
+            self._pOption = np.empty(p_shape, dtype=np.float64)
+            self._avg_score = np.empty(s_shape, dtype=np.float64)
+        else:
+            os.makedirs(path, exist_ok=True)
+            self._pOption = np.lib.format.open_memmap(os.path.join(path, 'pOption.npy'), mode='w+', dtype=np.float64, shape=p_shape)
+            self._avg_score = np.lib.format.open_memmap(os.path.join(path, 'avg_score.npy'), mode='w+', dtype=np.float64, shape=s_shape)
+        self.show = 0
+
+    def due(self, i):
+        """第 i 轮是否需要记录。"""
+        return (i + 1) % self.stride == 0 and self.show < len(self._avg_score)
+
+    def record(self, pList, avg_score):
+        """写入一次记录。"""
+        self._pOption[self.show] = pList
+        self._avg_score[self.show] = avg_score
+        self.show += 1
+
+    @property
+    def pOption(self):
+        """已记录的概率，(show, *shape, NUM_OPTIONS) 视图。"""
+        return self._pOption[:self.show]
+
+    @property
+    def avg_score(self):
+        """已记录的平均得分，(show, *shape) 视图。"""
+        return self._avg_score[:self.show]
+
+    def flush(self):
+        """把内存映射文件写回磁盘。"""
+        if self.path is not None:
+            self._pOption.flush()
+            self._avg_score.flush()
+
+    def close(self):
+        """
+        释放轨迹；自动创建的临时目录随之删除。之前取出的 pOption、avg_score 视图仍然可以读取，
+        需要长期保留时请先复制。
+        """
+        self._pOption = self._avg_score = None
+        if self.temporary:
+            self._cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def keep(self):
+        """保留自动创建的临时目录，不再在 close() 或回收时删除（例如检查点引用了这个目录）。"""
+        if self.temporary:
+            self._cleanup.detach()
+            self.temporary = False
+
+    def state(self):
+        """
+        检查点用的状态字典。轨迹写入内存映射文件时只保存目录，不复制轨迹；
+        自动创建的临时目录此后被检查点引用，不再自动删除。
+        """
+        state = {'stride': self.stride, 'show': self.show, 'capacity': len(self._avg_score)}
+        if self.path is None:
+            state['pOption'] = np.array(self.pOption)
+            state['avg_score'] = np.array(self.avg_score)
+        else:
+            self.flush()
+            self.keep()
+            state['path'] = self.path
+        return state
+
+    @classmethod
+    def restore(cls, state, num_epochs, num_options, shape=(), path=None, max_memory=MAX_MEMORY):
+        """
+        按 state() 保存的状态重建记录器，记录间隔不变。
+
+        参数：
+        - state：state() 的返回值
+        - num_epochs：游戏循环次数，可以大于原来的循环次数（延长游戏）
+        - 其余参数同 __init__；path 为 None 时沿用原来的内存映射目录
+
+        返回：
+        - 新的记录器，已包含之前的记录
+        """
+        stride, show = int(state['stride']), int(state['show'])
+        if num_epochs // stride < show:
+            raise ValueError(f"循环次数 {num_epochs} 少于已经记录的轮数QAQ")
+        path = state.get('path') if path is None else path
+        if path is not None and path == state.get('path') and num_epochs // stride == int(state['capacity']):
+            # 容量不变时直接以读写方式重新打开原来的内存映射文件
+            recorder = cls.__new__(cls)
+            recorder.stride, recorder.path, recorder.show, recorder.temporary = stride, path, show, False
+            recorder._pOption = np.load(os.path.join(path, 'pOption.npy'), mmap_mode='r+')
+            recorder._avg_score = np.load(os.path.join(path, 'avg_score.npy'), mmap_mode='r+')
+            return recorder
+
+        if 'path' in state:
+            pOption, avg_score = (np.array(a[:show]) for a in cls.load(state['path']))
+        else:
+            pOption, avg_score = state['pOption'], state['avg_score']
+        recorder = cls(num_epochs, num_options, stride, shape, path, max_memory)
+        recorder._pOption[:show] = pOption
+        recorder._avg_score[:show] = avg_score
+        recorder.show = show
+        return recorder
+
+    @staticmethod
+    def load(path):
+        """
+        以只读内存映射的方式读回 path 目录下的轨迹，不复制数据。
+
+        返回：
+        - (pOption, avg_score)
+        """
+        return (np.load(os.path.join(path, 'pOption.npy'), mmap_mode='r'),
+                np.load(os.path.join(path, 'avg_score.npy'), mmap_mode='r'))
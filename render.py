@@ -0,0 +1,190 @@
+# -*- coding: UTF-8 -*-
+# render.py
+# Python 3.8.10
+#
+# 轨迹绘图：不需要图形界面，直接保存为 PNG、SVG 等文件。
+# 长轨迹按像素列做最小/最大值抽稀，每列只画两个点，折线的外形与逐点绘制相同；
+# 多局（批量游戏、扫描结果）的轨迹画成各分位数之间的色带，而不是每局一条线。
+# 用法（在仓库根目录下运行）：
+#   python render.py sweep.npz -o sweep.png
+#   python render.py /tmp/trajectory_xxx -o trajectory.svg
+
+import argparse
+import os
+import warnings
+
+import numpy as np
+
+from display import figure
+
+# 各类选项的图例名称
+LABELS = {
+    'cautious': "谨慎",
+    'fairness': "公平",
+    'solidarity': "团结",
+    'wisdom': "智慧",
+    'bravery': "勇气",
+}
+
+# 默认画出的分位数：外层色带 5%~95%，内层色带 25%~75%，中位数画线
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def option_labels(options):
+    """选项集合 [(名称, 规则), ...] 的图例名称。"""
+    return [LABELS.get(name, name) for name, _ in options]
+
+
+def _columns(n, width):
+    """把 n 个点分成不超过 width 列，返回 (每列点数, 列数)。"""
+    size = -(-n // width)
+    return size, -(-n // size)
+
+
+def decimate(y, width):
+    """
+    最小/最大值抽稀：把序列分成不超过 width 列，每列保留最小值和最大值两个点（按原来的先后顺序）。
+
+    参数：
+    - y：(n,) 数组
+    - width：列数，通常为坐标轴的像素宽度
+
+    返回：
+    - (下标, 值)，点数不超过 2 * width；n 不超过 2 * width 时原样返回
+    """
+    y = np.asarray(y)
+    n = len(y)
+    if n <= 2 * width:
+        return np.arange(n), y
+    size, cols = _columns(n, width)
+    padded = np.concatenate([y, np.full(cols * size - n, y[-1])]).reshape(cols, size)
+    imin, imax = padded.argmin(axis=1), padded.argmax(axis=1)
+    start = np.arange(cols) * size
+    index = np.stack([start + np.minimum(imin, imax), start + np.maximum(imin, imax)], axis=1).ravel()
+    index = np.minimum(index, n - 1)
+    return index, y[index]
+
+
+def quantile_bands(runs, width, quantiles=QUANTILES):
+    """
+    多局轨迹在每个时刻的分位数。
+
+    参数：
+    - runs：(局数, n) 数组，可以含 NaN（例如提前结束的扫描任务）
+    - width：列数；n 超过 width 时，每列合并该列内所有局、所有时刻的值计算分位数
+    - quantiles：分位数
+
+    返回：
+    - (每列中心的下标 (列数,)，分位数 (len(quantiles), 列数))
+    """
+    runs = np.asarray(runs, dtype=np.float64)
+    num_runs, n = runs.shape
+    if n <= width:
+        center, pooled = np.arange(n, dtype=np.float64), runs.T
+    else:
+        size, cols = _columns(n, width)
+        padded = np.full((num_runs, cols * size), np.nan)
+        padded[:, :n] = runs
+        pooled = padded.reshape(num_runs, cols, size).transpose(1, 0, 2).reshape(cols, num_runs * size)
+        center = np.minimum(np.arange(cols) * size + (size - 1) / 2, n - 1)
+    if np.isnan(pooled).any():
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # 全部为 NaN 的列结果为 NaN
+            bands = np.nanquantile(pooled, quantiles, axis=1)
+    else:
+        bands = np.quantile(pooled, quantiles, axis=1)
+    return center, bands
+
+
+def _axes_width(ax):
+    """坐标轴的像素宽度。"""
+    fig = ax.figure
+    return max(int(fig.get_figwidth() * fig.dpi * ax.get_position().width), 1)
+
+
+def draw(ax, runs, labels=None, stride=1, width=None, quantiles=QUANTILES):
+    """
+    在坐标轴 ax 上画出每个选项的概率随时间的变化。
+
+    参数：
+    - ax：matplotlib 坐标轴
+    - runs：(局数, 记录次数, 选项数) 数组；只有一局时每个选项画一条线，多局时画分位数色带和中位数
+    - labels：每个选项的图例名称
+    - stride：记录间隔，横轴为轮次
+    - width：抽稀的列数，默认为坐标轴的像素宽度
+    - quantiles：多局时画出的分位数，从小到大；两两对称的分位数之间画色带，中间一个（数量为奇数时）画线
+    """
+    runs = np.asarray(runs, dtype=np.float64)
+    num_runs, n, num_options = runs.shape
+    labels = labels or [f"选项{option}" for option in range(num_options)]
+    width = width or _axes_width(ax)
+    epoch = lambda index: (np.asarray(index) + 1) * stride
+
+    for option in range(num_options):
+        color = f"C{option}"
+        if num_runs == 1:
+            index, y = decimate(runs[0, :, option], width)
+            ax.plot(epoch(index), y, color=color, label=labels[option])
+            continue
+        center, bands = quantile_bands(runs[:, :, option], width, quantiles)
+        x = epoch(center)
+        pairs = len(quantiles) // 2
+        for k in range(pairs):
+            ax.fill_between(x, bands[k], bands[-1 - k], color=color, alpha=0.15 * (k + 1), linewidth=0,
+                            label=None if len(quantiles) % 2 else (labels[option] if k == pairs - 1 else None))
+        if len(quantiles) % 2:
+            ax.plot(x, bands[pairs], color=color, label=labels[option])
+
+    ax.set_xlabel("轮次")
+    ax.set_ylabel("概率")
+    ax.legend(loc="upper right")
+
+
+def save(runs, path, labels=None, stride=1, width=None, quantiles=QUANTILES, title=None, figsize=(8, 4.5), dpi=100):
+    """
+    画出轨迹（见 draw）并保存到文件，格式由扩展名决定（.png、.svg、.pdf 等）。
+
+    返回：
+    - path
+    """
+    fig = figure(figsize=figsize, dpi=dpi)
+    ax = fig.add_subplot()
+    if title:
+        ax.set_title(title)
+    draw(ax, runs, labels, stride, width, quantiles)
+    fig.savefig(path, bbox_inches='tight')
+    return path
+
+
+def load_runs(path):
+    """
+    读取轨迹文件，统一为 (局数, 记录次数, 选项数) 数组。
+
+    参数：
+    - path：sweep.py 保存的 .npz 结果表（pOption 为 (任务数, 记录次数, 选项数)），
+      或 TrajectoryRecorder 的目录（pOption.npy 为 (记录次数, 选项数) 或 (记录次数, 局数, 选项数)）
+    """
+    if os.path.isdir(path):
+        pOption = np.load(os.path.join(path, 'pOption.npy'), mmap_mode='r')
+        return pOption[None] if pOption.ndim == 2 else np.transpose(pOption, (1, 0, 2))
+    with np.load(path) as table:
+        return table['pOption']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="把轨迹画成图片文件")
+    parser.add_argument('input', help="sweep.py 保存的 .npz 结果表，或轨迹记录器的目录")
+    parser.add_argument('-o', '--output', default='trajectory.png', help="输出图片路径，格式由扩展名决定")
+    parser.add_argument('--stride', type=int, default=1, help="记录间隔，用于换算横轴的轮次")
+    parser.add_argument('--quantiles', default=','.join(map(str, QUANTILES)), help="多局时画出的分位数，用逗号分隔")
+    parser.add_argument('--title', default=None, help="图片标题")
+    args = parser.parse_args()
+
+    runs = load_runs(args.input)
+    labels = list(LABELS.values()) if runs.shape[2] == len(LABELS) else None  # 五个经典选项
+    save(runs, args.output, labels, stride=args.stride, quantiles=tuple(float(q) for q in args.quantiles.split(',')), title=args.title)
+    print("图片已保存到", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# -*- coding: UTF-8 -*-
+# seeding.py
+# Python 3.8.10
+#
+# 可复现的独立随机数流。
+# 配置中的一个根种子（[Game] SEED）派生出每次运行、每个批次和每种玩家类型各自的子流：
+#   第 k 次运行：child(root, k)
+#   运行中的第 t 种玩家类型：child(run, t)
+# 子流只由根种子和下标决定，与进程数量、调度顺序无关。
+
+import numpy as np
+
+# 参数和配置中都没有给出种子时使用的根种子
+DEFAULT_SEED = 3407
+
+
+def seed_sequence(seed):
+    """
+    把 int、SeedSequence 或 None 统一为 SeedSequence。
+
+    返回 None 表示没有配置种子，沿用 numpy 的全局随机数生成器。
+    """
+    if seed is None or isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def resolve_root_seed(seed, params):
+    """
+    扫描、估计等多次运行的根种子：依次取 seed、配置中的 SEED（params.SEED）和 DEFAULT_SEED 中
+    第一个不为 None 的值，保证结果总是可复现。
+    """
+    return next(s for s in (seed, params.SEED, DEFAULT_SEED) if s is not None)
+
+
+def child(seq, *keys):
+    """
+    返回 seq 的第 keys 个子流，与 seq.spawn() 的结果相同，但不依赖已经派生过多少个子流。
+    """
+    return np.random.SeedSequence(seq.entropy, spawn_key=tuple(seq.spawn_key) + tuple(keys), pool_size=seq.pool_size)
+
+
+def generator(seq, *keys):
+    """
+    返回 seq 的第 keys 个子流上的 np.random.Generator；不给出 keys 时直接使用 seq。
+    """
+    return np.random.default_rng(child(seq, *keys) if keys else seq)
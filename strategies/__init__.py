@@ -0,0 +1,8 @@
+from strategies import neutral, normal
+
+# 策略注册表：玩家类型 → 该类型的数组版本策略
+# 每个策略以 (game_params, q, log_space) 调用，原地更新并返回该类型的概率数组 game_params.pList
+STRATEGIES = {
+    'normal': normal.norm_scheme_adjust_array,
+    'neutral': neutral.neutral_scheme_adjust,
+}
@@ -0,0 +1,3 @@
+def neutral_scheme_adjust(game_params, q, log_space=False):
+    """“中立”玩家始终按初始概率作答，不根据上一轮的结果调整。"""
+    return game_params.pList
@@ -2,7 +2,11 @@ import numpy as np
 import math
 
 def norm_scheme_adjust(game_params, q):
-    """根据上一轮的结果调整“常人”玩家的选择概率。"""
+    """
+    根据上一轮的结果调整“常人”玩家的选择概率。
+
+    各条规则通过 game_params.option_index 按选项规则查找下标，选项顺序与 [Q1] options 一致即可。
+    """
     if q == 1:
         # 从game_params中获取参数
         NUM_OPTIONS = game_params.NUM_OPTIONS
@@ -16,6 +20,13 @@ def norm_scheme_adjust(game_params, q):
         LEARN_RATE_DOWN = game_params.LEARN_RATE_DOWN
         SOLID_VALUE = game_params.SOLID_VALUE
 
+        # 各规则作用的选项下标（按 [Q1] options 中的规则查找），选项集合中没有的规则直接跳过
+        index = game_params.option_index
+        FAIRNESS = index.get('fairness')
+        SOLIDARITY = index.get('solidarity')
+        WISDOM = index.get('wisdom')
+        BRAVERY = index.get('bravery')
+
         option_scores = [0] * NUM_OPTIONS
         for score, option in zip(crowds_score_list, crowds_ans):
             option_scores[option] += score
@@ -30,34 +41,214 @@ def norm_scheme_adjust(game_params, q):
         for option in best_options:
             pList[option] *= math.pow(LEARN_RATE_UP, 1 / len(best_options))
 
-        if 4 not in ans_list:  # 没有人选择“勇气”？冲！
-            pList[4] = pList[4] * LEARN_RATE_UP
-        else:
-            best_option = crowds_ans[crowds_score_list.index(max(crowds_score_list))]
-            pList[best_option] *= LEARN_RATE_UP
+        if BRAVERY is not None:
+            if BRAVERY not in ans_list:  # 没有人选择“勇气”？冲！
+                pList[BRAVERY] = pList[BRAVERY] * LEARN_RATE_UP
+            else:
+                best_option = crowds_ans[crowds_score_list.index(max(crowds_score_list))]
+                pList[best_option] *= LEARN_RATE_UP
 
         # 如果“智慧”缺乏，冲！
-        if ans_list[3] == min(ans_list):
-            pList[3] = pList[3] * LEARN_RATE_UP
-        else:
-            pList[3] = pList[3] / LEARN_RATE_DOWN
+        if WISDOM is not None:
+            if ans_list[WISDOM] == min(ans_list):
+                pList[WISDOM] = pList[WISDOM] * LEARN_RATE_UP
+            else:
+                pList[WISDOM] = pList[WISDOM] / LEARN_RATE_DOWN
 
-        # 如果上一轮“团结”成功，继续增加选择“团结”的概率
-        if ans_list[2] == max(ans_list):
-            pList[2] = pList[3] * LEARN_RATE_UP
+        # 如果上一轮“团结”成功，继续增加选择“团结”的概率（以“智慧”的概率为基准）
+        if SOLIDARITY is not None and ans_list[SOLIDARITY] == max(ans_list):
+            pList[SOLIDARITY] = pList[SOLIDARITY if WISDOM is None else WISDOM] * LEARN_RATE_UP
 
         # 如果“公平”没有人选，增加选择“公平”的概率
-        if ans_list[1] == 0:
-            pList[1] = pList[1] * LEARN_RATE_UP
+        if FAIRNESS is not None and ans_list[FAIRNESS] == 0:
+            pList[FAIRNESS] = pList[FAIRNESS] * LEARN_RATE_UP
 
         # 信息交流
-        if is_communicate:
+        if is_communicate and SOLIDARITY is not None:
             # 每过一定轮次，有人呼吁要“团结”！
             if iter % 20 == 0:
-                if ans_list[2] == 0:
-                    pList[2] *= LEARN_RATE_UP  # 当有人呼吁“团结”，但上一轮没有人选择“团结”的时候
+                if ans_list[SOLIDARITY] == 0:
+                    pList[SOLIDARITY] *= LEARN_RATE_UP  # 当有人呼吁“团结”，但上一轮没有人选择“团结”的时候
                 else:  # 正反馈调节
-                    pList[2] = pList[2] * max(ans_list) / ans_list[2] * SOLID_VALUE  # 呼吁“团结”时的反应（可以根据需要进行更改，可能会产生意想不到的结果）
+                    pList[SOLIDARITY] = pList[SOLIDARITY] * max(ans_list) / ans_list[SOLIDARITY] * SOLID_VALUE  # 呼吁“团结”时的反应（可以根据需要进行更改，可能会产生意想不到的结果）
+
+        #归一化plist
+        return [i / sum(pList) for i in pList]
+
+def norm_scheme_adjust_array(game_params, q, log_space=False):
+    """
+    norm_scheme_adjust 的数组版本，原地更新 float64 数组 game_params.pList 并返回。
+
+    用掩码原地更新每个选项的概率，最后只归一化一次。线性空间下每一步的运算顺序与
+    norm_scheme_adjust 相同，在同一随机种子下结果逐位相同。
+
+    若 log_space 为 True，则在 game_params.log_pList 中以对数概率保存状态：乘除变为加减，
+    归一化使用 logsumexp，长时间运行时极小的概率不会下溢为 0；game_params.pList 同步为其指数。
+    """
+    if q == 1:
+        # 从game_params中获取参数
+        ans_list = np.asarray(game_params.ans_list)
+        crowds_ans = np.asarray(game_params.crowds_ans)
+        crowds_score_list = np.asarray(game_params.score_list, dtype=np.float64)
+        is_communicate = game_params.is_communicate
+        iter = game_params.iter
+        pList = game_params.pList
+        LEARN_RATE_UP = game_params.LEARN_RATE_UP
+        LEARN_RATE_DOWN = game_params.LEARN_RATE_DOWN
+        SOLID_VALUE = game_params.SOLID_VALUE
+
+        index = game_params.option_index
+        FAIRNESS = index.get('fairness')
+        SOLIDARITY = index.get('solidarity')
+        WISDOM = index.get('wisdom')
+        BRAVERY = index.get('bravery')
+
+        # 按玩家顺序累加每个选项的总得分
+        option_scores = np.bincount(crowds_ans, weights=crowds_score_list, minlength=len(ans_list))
+        best_options = option_scores == option_scores.max()
+        best_option = crowds_ans[crowds_score_list.argmax()]
+        most = ans_list.max()
+        least = ans_list.min()
+
+        if log_space:
+            logp = game_params.log_pList
+            LOG_UP = math.log(LEARN_RATE_UP)
+            LOG_DOWN = math.log(LEARN_RATE_DOWN)
+
+            logp[best_options] += LOG_UP / best_options.sum()
+            if BRAVERY is not None:
+                logp[best_option if (ans_list == BRAVERY).any() else BRAVERY] += LOG_UP
+            if WISDOM is not None:
+                logp[WISDOM] += LOG_UP if ans_list[WISDOM] == least else -LOG_DOWN
+            if SOLIDARITY is not None and ans_list[SOLIDARITY] == most:
+                logp[SOLIDARITY] = logp[SOLIDARITY if WISDOM is None else WISDOM] + LOG_UP
+            if FAIRNESS is not None and ans_list[FAIRNESS] == 0:
+                logp[FAIRNESS] += LOG_UP
+            if is_communicate and SOLIDARITY is not None and iter % 20 == 0:
+                if ans_list[SOLIDARITY] == 0:
+                    logp[SOLIDARITY] += LOG_UP
+                else:
+                    logp[SOLIDARITY] += math.log(most) - math.log(ans_list[SOLIDARITY]) + math.log(SOLID_VALUE)
+
+            # 归一化（logsumexp）
+            top = logp.max()
+            logp -= top + math.log(np.exp(logp - top).sum())
+            np.exp(logp, out=pList)
+            return pList
+
+        # 如果当前选项收益最高，增加此选项的概率
+        pList[best_options] *= math.pow(LEARN_RATE_UP, 1 / best_options.sum())
+
+        # 没有人选择“勇气”？冲！否则增加本轮得分最高的玩家所选选项的概率
+        if BRAVERY is not None:
+            pList[best_option if (ans_list == BRAVERY).any() else BRAVERY] *= LEARN_RATE_UP
+
+        # 如果“智慧”缺乏，冲！
+        if WISDOM is not None:
+            if ans_list[WISDOM] == least:
+                pList[WISDOM] *= LEARN_RATE_UP
+            else:
+                pList[WISDOM] /= LEARN_RATE_DOWN
+
+        # 如果上一轮“团结”成功，继续增加选择“团结”的概率（与单局版本一致，以“智慧”的概率为基准）
+        if SOLIDARITY is not None and ans_list[SOLIDARITY] == most:
+            pList[SOLIDARITY] = pList[SOLIDARITY if WISDOM is None else WISDOM] * LEARN_RATE_UP
+
+        # 如果“公平”没有人选，增加选择“公平”的概率
+        if FAIRNESS is not None and ans_list[FAIRNESS] == 0:
+            pList[FAIRNESS] *= LEARN_RATE_UP
+
+        # 信息交流：每过一定轮次，有人呼吁要“团结”！
+        if is_communicate and SOLIDARITY is not None and iter % 20 == 0:
+            if ans_list[SOLIDARITY] == 0:
+                pList[SOLIDARITY] *= LEARN_RATE_UP
+            else:
+                pList[SOLIDARITY] = pList[SOLIDARITY] * most / ans_list[SOLIDARITY] * SOLID_VALUE
+
+        #归一化plist
+        pList /= pList.sum()
+        return pList
+
+
+def norm_scheme_adjust_batch(game_params, q):
+    """
+    norm_scheme_adjust 的批量版本，同时调整 R 局互相独立的游戏中“常人”玩家的选择概率。
+
+    game_params 中 pList、ans_list 为 (R, NUM_OPTIONS) 数组，crowds_ans、score_list 为
+    (R, NUM_PLAYERS) 数组。每一步的运算顺序与 norm_scheme_adjust 保持一致，
+    因此 R 局中的每一局都与单局版本逐位相同。pList 会被原地修改并返回。
+
+    若 crowds_ans 为 None（仅计数模式），则改用 game_params.option_scores（每个选项的总得分，见 payoff.option_totals）
+    和 game_params.best_option（本轮得分最高的第一个玩家所选的选项）。
+
+    各条规则通过 game_params.option_index 按选项规则（fairness、solidarity 等）查找下标，
+    因此也适用于 questions/q1/default.ini 中自定义的选项集合。
+    """
+    if q == 1:
+        # 从game_params中获取参数
+        NUM_PLAYERS = game_params.NUM_PLAYERS
+        ans_list = game_params.ans_list
+        crowds_ans = game_params.crowds_ans
+        crowds_score_list = game_params.score_list
+        is_communicate = game_params.is_communicate
+        iter = game_params.iter
+        pList = game_params.pList
+        LEARN_RATE_UP = game_params.LEARN_RATE_UP
+        LEARN_RATE_DOWN = game_params.LEARN_RATE_DOWN
+        SOLID_VALUE = game_params.SOLID_VALUE
+
+        rows = np.arange(pList.shape[0])
+
+        if crowds_ans is not None:
+            # 按玩家顺序累加每个选项的总得分，与单局版本的求和顺序相同
+            option_scores = np.zeros(pList.shape, dtype=np.float64)
+            for i in range(NUM_PLAYERS):
+                option_scores[rows, crowds_ans[:, i]] += crowds_score_list[:, i]
+            best_option = crowds_ans[rows, crowds_score_list.argmax(axis=1)]
+        else:
+            # 仅计数模式：每个选项的总分和得分最高玩家的选项都由游戏给出
+            option_scores = game_params.option_scores
+            best_option = game_params.best_option
+
+        # 如果当前选项收益最高，增加此选项的概率
+        best_options = option_scores == option_scores.max(axis=1, keepdims=True)
+        factor = np.power(LEARN_RATE_UP, 1 / best_options.sum(axis=1))
+        pList *= np.where(best_options, factor[:, None], 1.0)
+
+        # 各规则作用的选项下标，选项集合中没有的规则直接跳过
+        index = game_params.option_index
+        FAIRNESS = index.get('fairness')
+        SOLIDARITY = index.get('solidarity')
+        WISDOM = index.get('wisdom')
+        BRAVERY = index.get('bravery')
+        most = ans_list.max(axis=1)
+
+        # 没有人选择“勇气”？冲！否则增加本轮得分最高的玩家所选选项的概率
+        # （与单局版本一致，这里判断的是人数列表中是否出现“勇气”的下标）
+        if BRAVERY is not None:
+            target = np.where((ans_list == BRAVERY).any(axis=1), best_option, BRAVERY)
+            pList[rows, target] *= LEARN_RATE_UP
+
+        # 如果“智慧”缺乏，冲！
+        if WISDOM is not None:
+            pList[:, WISDOM] = np.where(ans_list[:, WISDOM] == ans_list.min(axis=1), pList[:, WISDOM] * LEARN_RATE_UP, pList[:, WISDOM] / LEARN_RATE_DOWN)
+
+        if SOLIDARITY is not None:
+            # 如果上一轮“团结”成功，继续增加选择“团结”的概率（与单局版本一致，以“智慧”的概率为基准）
+            base = pList[:, SOLIDARITY if WISDOM is None else WISDOM]
+            pList[:, SOLIDARITY] = np.where(ans_list[:, SOLIDARITY] == most, base * LEARN_RATE_UP, pList[:, SOLIDARITY])
+
+        # 如果“公平”没有人选，增加选择“公平”的概率
+        if FAIRNESS is not None:
+            pList[:, FAIRNESS] = np.where(ans_list[:, FAIRNESS] == 0, pList[:, FAIRNESS] * LEARN_RATE_UP, pList[:, FAIRNESS])
+
+        # 信息交流
+        if is_communicate and SOLIDARITY is not None:
+            # 每过一定轮次，有人呼吁要“团结”！
+            if iter % 20 == 0:
+                solid = ans_list[:, SOLIDARITY]
+                pList[:, SOLIDARITY] = np.where(solid == 0, pList[:, SOLIDARITY] * LEARN_RATE_UP, pList[:, SOLIDARITY] * most / np.maximum(solid, 1) * SOLID_VALUE)
 
         #归一化plist
-        return [i / sum(pList) for i in pList]
\ No newline at end of file
+        pList /= pList.sum(axis=1, keepdims=True)
+        return pList
@@ -0,0 +1,173 @@
+# -*- coding: UTF-8 -*-
+# sweep.py
+# Python 3.8.10
+#
+# 策略超参数扫描：网格搜索或随机搜索，用进程池把每组参数的 Game 分配到所有核心上运行。
+# 用法（在仓库根目录下运行）：
+#   python sweep.py --grid LEARN_RATE_UP=1.001,1.005,1.01 --grid SOLID_VALUE=0.5,1 -o sweep.npz
+#   python sweep.py --random LEARN_RATE_UP=1.001:1.01 --random pList=dirichlet --samples 32
+
+import argparse
+import itertools
+import multiprocessing
+
+import numpy as np
+
+import seeding
+from convergence import DEFAULTS as CONVERGENCE_DEFAULTS
+from Game import Parameters, simulate
+
+# 可以扫描的策略超参数，合法性检查见 Parameters.replace
+SWEEPABLE = ('LEARN_RATE_UP', 'LEARN_RATE_DOWN', 'WIS_VALUE', 'SOLID_VALUE', 'pList')
+
+
+def apply_overrides(params, overrides):
+    """
+    返回应用了超参数覆盖的参数副本，不修改 params 本身。
+
+    参数：
+    - params：已加载的参数对象
+    - overrides：{参数名: 值} 字典，参数名必须在 SWEEPABLE 中
+    """
+    for name in overrides:
+        if name not in SWEEPABLE:
+            raise ValueError(f"参数 {name} 不能扫描，可选 {SWEEPABLE}")
+    return params.replace(**{name: value if name == 'pList' else float(value) for name, value in overrides.items()})
+
+
+def grid_jobs(grid):
+    """
+    网格搜索：grid 为 {参数名: [取值, ...]}，返回所有组合的覆盖字典列表。
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def random_jobs(space, num_samples, num_options, seed=None):
+    """
+    随机搜索：space 为 {参数名: (下界, 上界)}，pList 的取值为 'dirichlet' 时从均匀狄利克雷分布中抽取。
+    返回 num_samples 个覆盖字典。
+    """
+    rng = np.random.default_rng(seed)
+    jobs = []
+    for _ in range(num_samples):
+        job = {}
+        for name, bounds in space.items():
+            if name == 'pList':
+                job[name] = rng.dirichlet(np.ones(num_options)).tolist()
+            else:
+                job[name] = rng.uniform(*bounds)
+        jobs.append(job)
+    return jobs
+
+
+def _run_job(job):
+    """进程池中运行一组参数的 Game，返回最终概率、平均得分和轨迹。"""
+    index, params, seed = job
+    game = simulate(params=params, seed=seed)
+    converged = -1 if game.converged_epoch is None else game.converged_epoch
+    with game.recorder:  # 轨迹复制出来之后删除可能的临时目录
+        return index, np.array(game.params.pList, dtype=np.float64), np.array(game.pOption).T, np.array(game.avg_score), converged
+
+
+def _stack(arrays):
+    """把长度可能不同（提前结束的任务记录较少）的轨迹堆叠为一个数组，不足的部分填充 NaN。"""
+    length = max((len(a) for a in arrays), default=0)
+    out = np.full((len(arrays), length) + (arrays[0].shape[1:] if arrays else ()), np.nan)
+    for k, a in enumerate(arrays):
+        out[k, :len(a)] = a
+    return out
+
+
+def sweep(config_file, jobs, processes=None, seed=None, params=None):
+    """
+    并行运行一组超参数覆盖，返回列式结果表。
+
+    配置文件只在主进程中读取一次，每个任务拿到的是应用了覆盖的参数副本。
+
+    参数：
+    - config_file：配置文件路径
+    - jobs：覆盖字典列表（见 grid_jobs、random_jobs）
+    - processes：进程数，默认为 CPU 核心数
+    - seed：根随机种子，默认为配置中的 SEED（见 seeding.resolve_root_seed）；第 k 个任务使用其第 k 个子流，
+      因此结果与进程数量和调度顺序无关
+    - params：可选，已加载的参数对象；给出时不再读取 config_file
+
+    返回：
+    - {列名: 数组} 字典，每行对应一个任务：每个被扫描的参数一列，final_pList (n, NUM_OPTIONS)，
+      mean_avg_score (n,)，pOption (n, show, NUM_OPTIONS)，avg_score (n, show)，converged_epoch (n,)；
+      配置了收敛检测时，提前结束的任务的轨迹较短，之后的部分为 NaN，未收敛的任务 converged_epoch 为 -1
+    """
+    base = Parameters(config_file) if params is None else params
+    root = seeding.seed_sequence(seeding.resolve_root_seed(seed, base))
+    tasks = [(k, apply_overrides(base, job), seeding.child(root, k)) for k, job in enumerate(jobs)]
+
+    results = [None] * len(tasks)
+    with multiprocessing.Pool(processes) as pool:
+        for index, *result in pool.imap_unordered(_run_job, tasks):
+            results[index] = result
+
+    table = {}
+    for name in sorted(set(name for job in jobs for name in job)):
+        table[name] = np.array([job.get(name, getattr(base, name)) for job in jobs], dtype=np.float64)
+    table['final_pList'] = np.array([r[0] for r in results]).reshape(len(jobs), base.NUM_OPTIONS)
+    table['pOption'] = _stack([r[1] for r in results])
+    table['avg_score'] = _stack([r[2] for r in results])
+    table['mean_avg_score'] = np.nanmean(table['avg_score'], axis=1) if len(jobs) else np.zeros(0)
+    table['converged_epoch'] = np.array([r[3] for r in results], dtype=np.int64)
+    return table
+
+
+def _parse_spec(items, parse_value):
+    spec = {}
+    for item in items or []:
+        name, _, values = item.partition('=')
+        spec[name.strip()] = parse_value(name.strip(), values.strip())
+    return spec
+
+
+def main():
+    parser = argparse.ArgumentParser(description="策略超参数扫描")
+    parser.add_argument('--config', default='normal.ini', help="游戏配置文件")
+    parser.add_argument('--grid', action='append', metavar='NAME=V1,V2,...',
+                        help="网格搜索的取值；pList 的多个取值用 ; 分隔，例如 pList=0.2,0.2,0.2,0.2,0.2;0.25,0.15,0.3,0.15,0.15")
+    parser.add_argument('--random', action='append', metavar='NAME=LOW:HIGH',
+                        help="随机搜索的取值范围；pList=dirichlet 表示从均匀狄利克雷分布中抽取")
+    parser.add_argument('--samples', type=int, default=16, help="随机搜索的样本数")
+    parser.add_argument('--processes', type=int, default=None, help="进程数，默认为 CPU 核心数")
+    parser.add_argument('--seed', type=int, default=None, help="根随机种子，默认为配置中的 SEED")
+    parser.add_argument('--tolerance', type=float, default=None, help="收敛检测的概率漂移容差，收敛的任务提前结束")
+    parser.add_argument('--window', type=int, default=None, help="收敛检测的窗口长度")
+    parser.add_argument('-o', '--output', default=None, help="把结果表保存为 .npz 文件")
+    parser.add_argument('--plot', default=None, metavar='PATH', help="把所有任务的概率轨迹画成分位数色带，保存为图片")
+    args = parser.parse_args()
+
+    params = Parameters(args.config)
+    if args.tolerance is not None or args.window is not None:
+        convergence = dict(params.convergence or CONVERGENCE_DEFAULTS)
+        convergence.update({name: value for name, value in (('tolerance', args.tolerance), ('window', args.window)) if value is not None})
+        params = params.replace(convergence=convergence)
+    seed = seeding.resolve_root_seed(args.seed, params)
+    grid = _parse_spec(args.grid, lambda name, v: [list(map(float, x.split(','))) for x in v.split(';')] if name == 'pList' else list(map(float, v.split(','))))
+    space = _parse_spec(args.random, lambda name, v: v if name == 'pList' else tuple(map(float, v.split(':'))))
+    jobs = grid_jobs(grid) if grid else [{}]
+    if space:
+        jobs = [dict(g, **r) for g in jobs for r in random_jobs(space, args.samples, params.NUM_OPTIONS, seed)]
+
+    table = sweep(args.config, jobs, args.processes, seed, params=params)
+    for k, job in enumerate(jobs):
+        converged = f"收敛于第 {table['converged_epoch'][k]} 轮" if table['converged_epoch'][k] >= 0 else ""
+        print(job, "均分", f"{table['mean_avg_score'][k]:.4f}", "概率", np.round(table['final_pList'][k], 4).tolist(), converged)
+    if args.output:
+        np.savez(args.output, **table)
+        print("结果已保存到", args.output)
+    if args.plot:
+        import render
+        from recorder import default_stride
+        stride = default_stride(params.NUM_EPOCHS)
+        render.save(table['pOption'], args.plot, render.option_labels(params.options), stride=stride)
+        print("图片已保存到", args.plot)
+
+
+if __name__ == "__main__":
+    main()
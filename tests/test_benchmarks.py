@@ -0,0 +1,26 @@
+# -*- coding: UTF-8 -*-
+# test_benchmarks.py
+# Python 3.8.10
+#
+# 跑分脚本的冒烟测试：用极小的设置完整运行一遍，保证跑分本身不会因为接口变化而无法运行。
+# 用法（在仓库根目录下运行）：python -m pytest tests
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import bench_epoch
+
+CONFIG = os.path.join(ROOT, 'normal.ini')
+
+
+def test_bench_epoch_runs():
+    results = bench_epoch.run(CONFIG, epochs=[20], players=[10, 1000], repeat=2)
+    assert set(results) >= {'config_load', 'config_load_cached', 'game_main/epochs=20', 'calc_scores',
+                            'norm_scheme_adjust', 'norm_scheme_adjust_array',
+                            'population_step/players=10', 'population_step/players=1000'}
+    for result in results.values():
+        assert result['n'] > 0 and result['p50'] > 0
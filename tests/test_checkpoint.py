@@ -0,0 +1,67 @@
+# -*- coding: UTF-8 -*-
+# test_checkpoint.py
+# Python 3.8.10
+#
+# 检查点恢复的回归测试。用法（在仓库根目录下运行）：python -m pytest tests
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from Game import Game, Parameters, benchmark_brief, simulate
+
+CONFIG = os.path.join(ROOT, 'normal.ini')
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interrupt_at(game, epoch):
+    """让 game 在进行第 epoch 轮之前中断，模拟运行到一半被杀掉。"""
+    step = game.step
+
+    def interrupted(i):
+        if i == epoch:
+            raise Interrupted
+        step(i)
+    game.step = interrupted
+
+
+def test_resume_keeps_memmapped_trajectory(tmp_path):
+    params = Parameters(CONFIG).replace(NUM_EPOCHS=2000)
+    reference = Game(None, params=params.replace(), seed=1, record_stride=1, record_path=str(tmp_path / 'reference'))
+    reference.main(progress=False)
+
+    record_path = str(tmp_path / 'record')
+    checkpoint_path = str(tmp_path / 'checkpoint.npz')
+    game = Game(None, params=params.replace(), seed=1, record_stride=1, record_path=record_path)
+    interrupt_at(game, 1500)
+    with pytest.raises(Interrupted):
+        game.main(progress=False, checkpoint_path=checkpoint_path, checkpoint_every=1000)
+    before = np.array(np.load(os.path.join(record_path, 'pOption.npy'))[:1000])
+    assert before.sum() == pytest.approx(1000.0)
+
+    # 从原来的轨迹目录恢复：之前记录的 1000 轮不能被清空
+    resumed = Game.from_checkpoint(checkpoint_path, record_path=record_path)
+    assert resumed.epoch == 1000
+    np.testing.assert_array_equal(resumed.recorder.pOption, before)
+    resumed.main(progress=False, resume=True)
+
+    np.testing.assert_array_equal(resumed.pOption, reference.pOption)
+    np.testing.assert_array_equal(resumed.avg_score, reference.avg_score)
+    assert resumed.params.pList == reference.params.pList
+
+
+def test_config_checkpoint_is_not_written_by_library_runs(tmp_path):
+    params = Parameters(CONFIG).replace(NUM_EPOCHS=300)
+    path = tmp_path / 'configured.npz'
+    params.checkpoint = {'path': str(path), 'every': 100}  # 相当于配置了 [Checkpoint]
+    simulate(params=params, seed=1)
+    benchmark_brief(iter=200, params=params)
+    assert not path.exists()
@@ -0,0 +1,95 @@
+# -*- coding: UTF-8 -*-
+# test_equivalence.py
+# Python 3.8.10
+#
+# 各实现逐位相同的回归测试：向量化抽样与逐玩家 np.random.choice、数组策略与列表策略、
+# R=1 的批量游戏与单局游戏，扫描结果与进程数量无关，以及重复使用同一个参数对象的结果相同。用法（在仓库根目录下运行）：python -m pytest tests
+
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from Game import Game, Parameters, simulate
+from batch import BatchGame
+from sweep import grid_jobs, sweep
+
+CONFIG = os.path.join(ROOT, 'normal.ini')
+EPOCHS = 300
+
+
+class ChoiceGame(Game):
+    """原来的抽样方式：每个玩家调用一次 np.random.choice。"""
+
+    def sample_players(self):
+        for _ in range(self.params.NUM_PLAYERS):
+            ans = np.random.choice(self.params.NUM_OPTIONS, p=self.params.pList)
+            self.params.ans_list[ans] += 1
+            self.params.crowds_ans.append(ans)
+
+
+def unseeded_params():
+    params = Parameters(CONFIG).replace(NUM_EPOCHS=EPOCHS)
+    params.SEED = None  # 使用 numpy 的全局随机数生成器
+    return params
+
+
+def run(game, seed=None):
+    if seed is not None:
+        np.random.seed(seed)
+    game.main(progress=False)
+    return game
+
+
+def assert_same_run(a, b):
+    np.testing.assert_array_equal(np.asarray(a.params.pList), np.asarray(b.params.pList))
+    np.testing.assert_array_equal(a.pOption, b.pOption)
+    np.testing.assert_array_equal(a.avg_score, b.avg_score)
+
+
+def test_vectorized_sampling_matches_np_random_choice():
+    params = unseeded_params()
+    game = run(Game(None, params=params.replace()), seed=5)
+    legacy = run(ChoiceGame(None, params=params.replace()), seed=5)
+    assert_same_run(game, legacy)
+
+
+def test_array_strategy_matches_list_strategy():
+    params = Parameters(CONFIG).replace(NUM_EPOCHS=EPOCHS)
+    game = run(Game(None, params=params.replace(), seed=1))
+    array = run(Game(None, params=params.replace(), seed=1, array_strategy=True))
+    assert_same_run(game, array)
+
+
+def test_single_replica_batch_matches_game():
+    params = unseeded_params()
+    game = run(Game(None, params=params.replace()), seed=5)
+    batch = run(BatchGame(None, 1, params=params.replace()), seed=5)
+    np.testing.assert_array_equal(batch.params.pList[0], np.asarray(game.params.pList))
+    np.testing.assert_array_equal(batch.pOption[:, 0].T, game.pOption)
+    np.testing.assert_array_equal(batch.avg_score[:, 0], game.avg_score)
+
+
+def test_sweep_does_not_depend_on_worker_count():
+    params = Parameters(CONFIG).replace(NUM_EPOCHS=EPOCHS)
+    jobs = grid_jobs({'LEARN_RATE_UP': [1.002, 1.005, 1.01], 'SOLID_VALUE': [0.5, 1.0]})
+    serial = sweep(None, jobs, processes=1, seed=7, params=params)
+    parallel = sweep(None, jobs, processes=4, seed=7, params=params)
+    assert serial.keys() == parallel.keys()
+    for name in serial:
+        np.testing.assert_array_equal(serial[name], parallel[name])
+
+
+def test_reusing_params_gives_same_run():
+    params = Parameters(CONFIG).replace(NUM_EPOCHS=EPOCHS)
+    pList = list(params.pList)
+    first = simulate(params=params, seed=3)
+    second = simulate(params=params, seed=3)
+    assert params.pList == pList
+    assert_same_run(first, second)
+    batch = BatchGame(None, 2, params=params, seed=3)
+    batch.main(progress=False)
+    assert params.pList == pList